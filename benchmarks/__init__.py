@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+
+"""
+Throughput benchmarks for the parser and evaluators. Run with python -m benchmarks.run.
+"""
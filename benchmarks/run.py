@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+"""
+Measure parser and evaluator throughput on a synthetic project.
+
+    python -m benchmarks.run --fields 500 --records 5000 --events 3 --json after.json --compare before.json
+
+Each phase is run --repeat times and the best time is kept. Results are printed as a table and
+can be saved as JSON, together with the configuration and the versions they were measured
+with, so that runs on different versions of the package can be compared with --compare.
+"""
+
+import argparse
+import dataclasses
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Union
+import numpy as np
+import pandas as pd
+import pyparsing as pp
+
+from redcap_branch_parser import (
+    BranchingLogicParser, EventIndex, FrameEvaluator, assemble, compile_data_dictionary, evaluate_ast, execute,
+)
+from redcap_branch_parser.branching_logic_parser import _build_redcap_branching_logic_grammar
+from .synthetic import ProjectConfig, generate_project
+
+# Per-record phases evaluate every rule against at most this many rows
+RECORD_SAMPLE = 500
+
+def _git_revision() -> Union[str, None]:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment() -> Dict[str, object]:
+    return {
+        "revision": _git_revision(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pyparsing": pp.__version__,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+class Benchmark:
+    def __init__(self, repeat: int) -> None:
+        self.repeat = repeat
+        self.results: List[Dict[str, object]] = []
+
+    def measure(self, phase: str, unit: str, operations: int, function: Callable[[], object]) -> None:
+        best = float("inf")
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+        self.results.append({
+            "phase": phase,
+            "unit": unit,
+            "operations": operations,
+            "seconds": best,
+            "rate": operations / best if best > 0 else float("inf"),
+        })
+
+def run(config: ProjectConfig, repeat: int) -> Dict[str, object]:
+    df_datadict, data_df = generate_project(config)
+    logic = sorted({value for value in df_datadict["branching_logic"] if isinstance(value, str)})
+    benchmark = Benchmark(repeat)
+
+    benchmark.measure("grammar build", "grammars", 1, _build_redcap_branching_logic_grammar)
+    for backend in ("pyparsing", "pratt"):
+        parser = BranchingLogicParser(cache=None, backend=backend)
+        benchmark.measure(f"parse ({backend})", "strings", len(logic), lambda: [parser.create_ast(s) for s in logic])
+    benchmark.measure(
+        "compile data dictionary", "fields", len(df_datadict),
+        lambda: compile_data_dictionary(df_datadict, BranchingLogicParser(cache=None, backend="pratt")),
+    )
+
+    parser = BranchingLogicParser()
+    asts = [parser.create_ast(s) for s in logic]
+    sample = data_df.iloc[:RECORD_SAMPLE]
+    records = [record for _, _, record in EventIndex(sample).records()] if config.events > 1 else sample.to_dict("records")
+    evaluations = len(asts) * len(records)
+
+    benchmark.measure("substitute", "evaluations", evaluations,
+                      lambda: [parser.substitute(ast, record) for ast in asts for record in records])
+
+    rules = [parser.compile(s) for s in logic]
+    programs = [assemble(ast) for ast in asts]
+    benchmark.measure("evaluate (compiled)", "evaluations", evaluations,
+                      lambda: [rule(record) for record in records for rule in rules])
+    benchmark.measure("evaluate (AST walk)", "evaluations", evaluations,
+                      lambda: [evaluate_ast(ast, record) for record in records for ast in asts])
+    benchmark.measure("evaluate (bytecode)", "evaluations", evaluations,
+                      lambda: [execute(program, record) for record in records for program in programs])
+
+    plan = compile_data_dictionary(df_datadict, parser)
+    benchmark.measure("evaluate (plan, per record)", "evaluations", evaluations,
+                      lambda: [plan.evaluate_record(record) for record in records])
+    simplified = plan.simplify(sample)
+    benchmark.measure("evaluate (simplified, per record)", "evaluations", evaluations,
+                      lambda: [simplified.evaluate_record(record) for record in records])
+    benchmark.measure("evaluate (frame)", "evaluations", len(asts) * len(data_df),
+                      lambda: [FrameEvaluator(data_df).evaluate(ast) for ast in asts])
+    benchmark.measure("evaluate (plan, frame)", "evaluations", len(plan.expressions) * len(data_df),
+                      lambda: plan.evaluate(data_df))
+
+    return {
+        "environment": environment(),
+        "config": config.as_dict(),
+        "project": {
+            "fields": len(df_datadict),
+            "rules": len(logic),
+            "rows": len(data_df),
+            "columns": len(data_df.columns),
+            "sharing": plan.sharing()._asdict(),
+        },
+        "results": benchmark.results,
+    }
+
+def report(run_result: Dict[str, object], baseline: Union[Dict[str, object], None] = None) -> str:
+    baseline_rates = {}
+    if baseline is not None:
+        baseline_rates = {result["phase"]: result["rate"] for result in baseline["results"]}
+
+    project = run_result["project"]
+    lines = [
+        f"revision {run_result['environment']['revision']}, python {run_result['environment']['python']}: "
+        f"{project['fields']} fields, {project['rules']} distinct rules, {project['rows']} rows",
+        "",
+        f"{'phase':<32} {'rate':>14} {'unit':<14} {'seconds':>9}" + (f" {'vs baseline':>12}" if baseline else ""),
+    ]
+    for result in run_result["results"]:
+        line = f"{result['phase']:<32} {result['rate']:>14,.0f} {result['unit'] + '/s':<14} {result['seconds']:>9.4f}"
+        if result["phase"] in baseline_rates:
+            line += f" {result['rate'] / baseline_rates[result['phase']]:>11.2f}x"
+        lines.append(line)
+    return "\n".join(lines)
+
+def main(argv: Union[List[str], None] = None) -> None:
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for field in dataclasses.fields(ProjectConfig):
+        arguments.add_argument(f"--{field.name.replace('_', '-')}", type=field.type, default=field.default)
+    arguments.add_argument("--repeat", type=int, default=3, help="Runs per phase; the best is kept.")
+    arguments.add_argument("--json", help="Save the results to this file.")
+    arguments.add_argument("--compare", help="Compare against the results saved in this file.")
+    options = vars(arguments.parse_args(argv))
+
+    repeat, json_path, compare_path = options.pop("repeat"), options.pop("json"), options.pop("compare")
+    result = run(ProjectConfig(**options), repeat)
+
+    baseline = None
+    if compare_path:
+        with open(compare_path) as handle:
+            baseline = json.load(handle)
+    print(report(result, baseline))
+    if json_path:
+        with open(json_path, "w") as handle:
+            json.dump(result, handle, indent=2)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+"""
+Synthetic REDCap projects for benchmarking: a data dictionary with branching logic and a
+matching records export, generated reproducibly from a seed.
+"""
+
+import random
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Tuple
+import pandas as pd
+from redcap_branch_parser import ColumnTable
+
+@dataclass
+class ProjectConfig:
+    """
+    The shape of a synthetic project.
+    """
+    fields: int = 200
+    forms: int = 10
+    records: int = 2000
+    # Number of events; more than one makes the project longitudinal
+    events: int = 1
+    # Share of fields with branching logic, and the maximum nesting depth of that logic
+    branching: float = 0.6
+    depth: int = 3
+    # Share of fields that are checkboxes, and of references that name another event
+    checkbox: float = 0.2
+    cross_event: float = 0.1
+    choices: int = 4
+    seed: int = 2022
+
+    def as_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+class _LogicGenerator:
+    def __init__(self, rng: random.Random, config: ProjectConfig, events: List[str]) -> None:
+        self.rng = rng
+        self.config = config
+        self.events = events
+
+    def comparison(self, candidates: List[Tuple[str, str]]) -> str:
+        rng = self.rng
+        field, field_type = rng.choice(candidates)
+        prefix = ""
+        if len(self.events) > 1 and rng.random() < self.config.cross_event:
+            prefix = f"[{rng.choice(self.events)}]"
+        if field_type == "checkbox":
+            return f"{prefix}[{field}({rng.randint(1, self.config.choices)})]='{rng.randint(0, 1)}'"
+        if field_type == "integer":
+            return f"{prefix}[{field}]{rng.choice(['>', '>=', '<', '<='])}'{rng.randint(0, 100)}'"
+        if field_type == "text":
+            return f"{prefix}[{field}]{rng.choice(['=', '<>'])}''"
+        return f"{prefix}[{field}]{rng.choice(['=', '<>'])}'{rng.randint(1, self.config.choices)}'"
+
+    def logic(self, candidates: List[Tuple[str, str]], depth: int) -> str:
+        rng = self.rng
+        if depth == 0 or rng.random() < 0.35:
+            return self.comparison(candidates)
+        kind = rng.random()
+        if kind < 0.1:
+            return f"!({self.logic(candidates, depth - 1)})"
+        operator = rng.choice([" and ", " or "])
+        operands = [self.logic(candidates, depth - 1) for _ in range(rng.randint(2, 3))]
+        return "(" + operator.join(operands) + ")" if depth < self.config.depth else operator.join(operands)
+
+def _field_type(rng: random.Random, config: ProjectConfig) -> Tuple[str, object]:
+    """
+    A field type and its text validation.
+    """
+    if rng.random() < config.checkbox:
+        return "checkbox", None
+    return rng.choice([("radio", None), ("dropdown", None), ("yesno", None), ("text", "integer"), ("text", None)])
+
+def generate_data_dictionary(config: ProjectConfig) -> pd.DataFrame:
+    """
+    A data dictionary whose branching logic only refers to earlier fields, as in real projects.
+    """
+    rng = random.Random(config.seed)
+    events = [f"event_{number}_arm_1" for number in range(1, config.events + 1)]
+    generator = _LogicGenerator(rng, config, events)
+    choices = " | ".join(f"{code}, Choice {code}" for code in range(1, config.choices + 1))
+
+    rows = [{"field_name": "record_id", "form_name": "form_1", "field_type": "text"}]
+    candidates: List[Tuple[str, str]] = []
+    for number in range(1, config.fields):
+        field = f"field_{number}"
+        field_type, validation = _field_type(rng, config)
+        logic = None
+        if candidates and rng.random() < config.branching:
+            logic = generator.logic(candidates, config.depth)
+        rows.append({
+            "field_name": field,
+            "form_name": f"form_{1 + number * config.forms // config.fields}",
+            "field_type": field_type,
+            "select_choices_or_calculations": choices if field_type in ("checkbox", "radio", "dropdown") else None,
+            "text_validation_type_or_show_slider_number": validation,
+            "branching_logic": logic,
+        })
+        kind = "integer" if validation == "integer" else field_type
+        candidates.append((field, kind))
+    return pd.DataFrame(rows).set_index("field_name")
+
+def generate_records(df_datadict: pd.DataFrame, config: ProjectConfig) -> pd.DataFrame:
+    """
+    A records export (one row per record and event, all values as strings) for a data dictionary.
+    """
+    rng = random.Random(config.seed + 1)
+    longitudinal = config.events > 1
+    columns = ColumnTable.from_data_dictionary(df_datadict, longitudinal=longitudinal).columns
+    types = dict(zip(df_datadict.index, df_datadict["field_type"]))
+    validations = dict(zip(df_datadict.index, df_datadict["text_validation_type_or_show_slider_number"]))
+
+    def value(column: str) -> str:
+        if column.endswith("_complete"):
+            return str(rng.choice([0, 2]))
+        field = column.split("___")[0]
+        if "___" in column:
+            return str(rng.randint(0, 1))
+        if types.get(field) == "yesno":
+            return rng.choice(["0", "1", ""])
+        if types.get(field) in ("radio", "dropdown"):
+            return rng.choice([str(rng.randint(1, config.choices)), ""])
+        if validations.get(field) == "integer":
+            return rng.choice([str(rng.randint(0, 100)), ""])
+        return rng.choice(["", "some text"])
+
+    rows = []
+    for record in range(1, config.records + 1):
+        for event in range(1, config.events + 1):
+            row = {column: value(column) for column in columns}
+            row["record_id"] = str(record)
+            if longitudinal:
+                row["redcap_event_name"] = f"event_{event}_arm_1"
+            rows.append(row)
+    return pd.DataFrame(rows, columns=columns)
+
+def generate_project(config: ProjectConfig) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    The data dictionary and records of a synthetic project.
+    """
+    df_datadict = generate_data_dictionary(config)
+    return df_datadict, generate_records(df_datadict, config)
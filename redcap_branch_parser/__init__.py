@@ -17,4 +17,28 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import pyparsing as pp
-from .branching_logic_parser import BranchingLogicParser
\ No newline at end of file
+from .branching_logic_parser import BranchingLogicParser, BACKENDS, redcap_branching_logic_grammar
+from .myfield import myField, FieldTable, default_field_table, intern_field
+from .parse_cache import ParseCache, CacheInfo, default_parse_cache
+from .disk_cache import CompiledRuleCache, CachedRule, PARSER_VERSION
+from .compiler import CompiledRule, compile_ast
+from .columns import ColumnTable
+from .evaluator import LookupCounter, evaluate_ast
+from .bytecode import Program, assemble, execute, disassemble
+from .coercion import NUMBER, DATE, to_number, to_date
+from .data_dictionary import field_types
+from .encoding import encode_values, parse_choices
+from .sql import SQLPredicate, to_sql, quote_identifier
+from .frame import FrameEvaluator, evaluate_frame
+from .events import EventIndex, EventRecord
+from .bitmap import BitmapIndex
+from .plan import VisibilityPlan, compile_data_dictionary
+from .cse import SharedExpressions, SharingInfo
+from .pratt import PrattParser, BranchingLogicSyntaxError
+from .parallel import parallel_evaluate
+from .instrumentation import ParserInstrumentation, PhaseStats, StatsSnapshot
+from .trace import TraceEvent, Tracer, log_trace
+from .specialize import specialize
+from .optimize import simplify, estimate_selectivity, heuristic_selectivity
+from .streaming import stream_csv
+from .dependency import IncrementalEvaluator
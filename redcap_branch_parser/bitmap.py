@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Mapping, Union
+from .coercion import CONVERTERS, typed_comparison
+from .encoding import encode_values
+from .events import EventIndex
+from .myfield import myField
+from .logic_ast import COMPARISON_OPERATORS, LookupKey, root, is_constant, is_comparison, is_negation, split_chain, lookup_key
+
+Bitmap = int
+
+class BitmapIndex:
+    """
+    This class indexes a set of records by (field, value), holding one bitmap per pair in
+    which bit i is set if record i has that value.
+
+    A comparison in an AST then becomes a precomputed bitmap (the union of the bitmaps of the
+    values that satisfy it) and AND, OR, and ! become bitwise operations on Python integers,
+    so rules are answered without touching row data.
+
+    A column is indexed the first time a rule refers to it, one bitmap per distinct value,
+    which suits coded fields (radio, dropdown, yesno, checkbox) far better than free text.
+
+    data_df : pd.DataFrame
+        One record per row, one REDCap field per column.
+    events : Union[EventIndex, None]
+        Resolves [event][field] references of longitudinal DataFrames. Built from data_df on
+        first use if omitted.
+    field_types : Union[Mapping[str, str], None]
+        The comparison type of numeric and date fields (see compiler.compile_ast). Their
+        comparisons convert each distinct value of the column and compare it with the
+        converted literal.
+    """
+    def __init__(
+        self,
+        data_df: pd.DataFrame,
+        events: Union[EventIndex, None] = None,
+        field_types: Union[Mapping[str, str], None] = None,
+    ) -> None:
+        self.data_df: pd.DataFrame = data_df
+        self.events: Union[EventIndex, None] = events
+        self.field_types: Mapping[str, str] = field_types or {}
+        self.size: int = len(data_df)
+        self.all: Bitmap = (1 << self.size) - 1
+        self.__columns: Dict[LookupKey, Dict[str, Bitmap]] = {}
+
+    def column(self, key: LookupKey) -> Dict[str, Bitmap]:
+        """
+        The bitmaps of a column, keyed by stringified value, building them on first use.
+        """
+        try:
+            return self.__columns[key]
+        except KeyError:
+            pass
+        if isinstance(key, tuple):
+            if self.events is None:
+                self.events = EventIndex(self.data_df)
+            values = self.events.values(key)
+        else:
+            values = self.data_df[key]
+        # Values that stringify alike (e.g. 1 and "1") share a code, and so a bitmap
+        codes, categories = encode_values(values)
+        bitmaps: Dict[str, Bitmap] = {}
+        for code, value in enumerate(categories):
+            packed = np.packbits(codes == code, bitorder="little")
+            bitmaps[value] = int.from_bytes(packed.tobytes(), "little")
+        self.__columns[key] = bitmaps
+        return bitmaps
+
+    def __comparison(self, node: list) -> Bitmap:
+        lhs, symbol, expected = node
+        if not isinstance(lhs, myField):
+            return self.all if COMPARISON_OPERATORS[symbol](lhs, expected) else 0
+
+        bitmaps = self.column(lookup_key(lhs))
+        compare = COMPARISON_OPERATORS[symbol]
+        kind, target = typed_comparison(lhs, expected, self.field_types)
+        if kind is not None:
+            convert = CONVERTERS[kind]
+            result = 0
+            for value, bitmap in bitmaps.items():
+                if compare(convert(value), target):
+                    result |= bitmap
+            return result
+
+        if symbol == '=':
+            return bitmaps.get(expected, 0)
+        if symbol == "<>":
+            return self.all ^ bitmaps.get(expected, 0)
+
+        result = 0
+        for value, bitmap in bitmaps.items():
+            if compare(value, expected):
+                result |= bitmap
+        return result
+
+    def evaluate_node(self, node: list) -> Bitmap:
+        """
+        Evaluate a single AST node to the bitmap of records it holds for.
+        """
+        if is_comparison(node):
+            return self.__comparison(node)
+        if is_constant(node):
+            return self.all if node[0] else 0
+        if is_negation(node):
+            return self.all ^ self.evaluate_node(node[1])
+
+        operator, operands = split_chain(node)
+        if operator == 'AND':
+            result = self.all
+            for operand in operands:
+                result &= self.evaluate_node(operand)
+                if not result:
+                    break
+        else:
+            result = 0
+            for operand in operands:
+                result |= self.evaluate_node(operand)
+                if result == self.all:
+                    break
+        return result
+
+    def evaluate(self, ast: list) -> Bitmap:
+        """
+        Evaluate an AST as returned by create_ast() to the bitmap of records it holds for.
+        """
+        return self.evaluate_node(root(ast))
+
+    def to_mask(self, bitmap: Bitmap) -> np.ndarray:
+        """
+        Convert a bitmap into one boolean per record.
+        """
+        packed = np.frombuffer(bitmap.to_bytes((self.size + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(packed, count=self.size, bitorder="little").astype(bool)
+
+    def matching(self, ast: list) -> pd.Index:
+        """
+        The index labels of the records the AST holds for.
+        """
+        return self.data_df.index[self.to_mask(self.evaluate(ast))]
@@ -2,7 +2,141 @@
 
 import pyparsing as pp
 import operator as op
-from myfield import myField
+import threading
+from contextvars import ContextVar
+from typing import Dict, Mapping, Union
+from .myfield import myField, FieldTable, default_field_table
+from .parse_cache import ParseCache, default_parse_cache
+from .compiler import CompiledRule, compile_ast
+from .coercion import CONVERTERS, typed_comparison
+from .frame import evaluate_frame
+from .bytecode import Program, assemble
+from .sql import SQLPredicate, to_sql
+from .pratt import PrattParser
+from .disk_cache import CompiledRuleCache, reintern
+from .instrumentation import ParserInstrumentation
+from .logic_ast import lookup_key, split_chain
+from .trace import Tracer, TraceEvent
+from .specialize import specialize
+from .optimize import simplify
+
+# The table the shared grammar's parse actions intern fields into, set by the parser in use
+_field_table: ContextVar[FieldTable] = ContextVar("field_table", default=default_field_table)
+
+def _create_my_field(s: str, loc: int, tokens: pp.ParseResults):
+    """
+    Parse action creates a myField object corresponding to a regular REDCap field
+    """
+    return _field_table.get().intern(tokens[0])
+
+def _create_my_event_field(s: str, loc: int, tokens: pp.ParseResults):
+    """
+    Parse action creates a myField object corresponding to a REDCap field in event
+    """
+    return _field_table.get().intern(tokens[1], event=tokens[0])
+
+def _create_my_check(s: str, loc: int, tokens: pp.ParseResults):
+    """
+    Parse action creates a myField object corresponding to a REDCap field checkbox
+    """
+    return _field_table.get().intern(tokens[0], event=None, check=tokens[1])
+
+def _create_my_event_check(s: str, loc: int, tokens: pp.ParseResults):
+    """
+    Parse action creates a myField object corresponding to REDCap field checkbox in event
+    """
+    return _field_table.get().intern(tokens[1], event=tokens[0], check=tokens[2])
+
+def _build_redcap_branching_logic_grammar() -> pp.ParserElement:
+    """
+    This function creates a parser for the REDCap Branching Logic.
+    The grammar for the REDCap Branching logic in Backus-Naur Form (BNF) is defined as follows:
+    
+        expression ::=  atom [ operator atom ]*
+        atom       ::=  variable | value | checkbox | event | varcheck_in_event | variable_in_event | variable_in_check
+        operator   ::=  "=" | "<>" | ">" | ">=" | "<" | "<="
+        variable   ::=  "[" alphabet "]"
+        checkbox   ::=  "(" alphabet ")"
+        event      ::=  "[" alphabet "]"
+        value      ::=  "'" .*? "'" | '"' .*? '"'
+        varcheck_in_event ::= event variable_in_check
+        variable_in_event ::= event variable
+        variable_in_check ::= "[" alphabet checkbox "]"
+    
+    The expression is evaluated using infix notation, with the following operator precedence:
+        1. "!" (not)
+        2. "=" | "<>" | ">" | ">=" | "<" | "<=" (comparison)
+        3. "AND"
+        4. "OR"
+
+    The parse actions are module-level functions, so the resulting grammar holds no reference
+    to any parser instance and can be shared between them.
+    """
+    # Define the alphabet of our grammar
+    alphabet = pp.Word(pp.alphanums + "_")
+    lbrace = pp.Suppress(pp.Literal('['))
+    rbrace = pp.Suppress(pp.Literal(']'))
+
+    # Define the verbs (i.e. operators) of our grammar
+    operator = pp.oneOf(("=", "<>", ">", ">=", "<", "<=")).set_results_name("operator")
+    and_ = pp.CaselessKeyword("AND").set_results_name("bool")
+    or_  = pp.CaselessKeyword("OR").set_results_name("bool")
+    not_ = pp.Keyword("!").set_results_name("bool")
+
+    # Now we define the variables
+    variable = pp.QuotedString(quote_char="[", end_quote_char="]").set_results_name("variable").set_parse_action(_create_my_field)
+    
+    checkbox = pp.QuotedString(quote_char="(", end_quote_char=")").set_results_name("checkbox")
+    event    = pp.QuotedString(quote_char="[", end_quote_char="]").set_results_name("event")
+    value    = (pp.QuotedString(quoteChar='"') | pp.QuotedString(quoteChar="'")).set_results_name("value")
+
+    # REDCap Checkbox events
+    variable_in_check = (lbrace + alphabet.set_results_name("variable_checkbox") + checkbox + rbrace).set_parse_action(_create_my_check)
+    variable_in_event = (event + pp.QuotedString(quote_char="[", end_quote_char="]")).set_parse_action(_create_my_event_field)
+
+
+    varcheck_in_event = (event + (lbrace + alphabet.set_results_name("variable_checkbox") + checkbox + rbrace)).set_parse_action(_create_my_event_check)
+
+    # The expression
+    field = ( varcheck_in_event | variable_in_event | variable_in_check | variable | value)
+    expression = pp.Group(field + operator + value).set_results_name("expression", list_all_matches=True)
+
+    # Define the syntax as infix notation, using variables and operators
+    redcap_branching_logic_grammar = pp.infix_notation(
+        expression,
+        # Define operator list, number of terms, and associativity
+        [
+            (not_, 1, pp.opAssoc.RIGHT),
+            (operator, 2, pp.opAssoc.LEFT),
+            (and_, 2, pp.opAssoc.LEFT),
+            (or_,  2, pp.opAssoc.LEFT),
+        ]
+    )
+    return redcap_branching_logic_grammar
+
+# The grammar is built at most once per process and shared by every parser instance.
+_grammar = None
+_grammar_lock = threading.Lock()
+
+def redcap_branching_logic_grammar() -> pp.ParserElement:
+    """
+    Returns the process-wide REDCap Branching Logic grammar, building it on first use.
+
+    Building the `infix_notation` grammar is expensive, so it is done lazily and exactly once,
+    guarded by a lock for threaded callers. Calling this function before forking worker
+    processes (e.g. in a pool initialiser's parent) lets the workers inherit a pre-warmed grammar.
+    """
+    global _grammar
+    if _grammar is None:
+        with _grammar_lock:
+            # Re-check inside the lock in case another thread built it while we waited
+            if _grammar is None:
+                _grammar = _build_redcap_branching_logic_grammar()
+    return _grammar
+
+
+# Parsing backends accepted by BranchingLogicParser
+BACKENDS = ("pyparsing", "pratt")
 
 class BranchingLogicParser:
     """
@@ -19,112 +153,74 @@ class BranchingLogicParser:
         4. Evaluate the resulting list-based boolean expression.
            Now we evaluate the resulting boolean expression and return a single boolean value.
 
+    Steps 3 and 4 can instead be fused by compiling the AST once into pre-bound closures
+    (see compiler.compile_ast), which is what parse() does and what compile() returns for reuse.
+
     In __init__(), the class exposes the various user-facing methods that can be used:
-        self.grammar    = Initialises the grammar
+        self.grammar    = The shared grammar (built once per process), or None for the pratt backend
+        self.cache      = LRU cache of parsed ASTs (see ParseCache)
         self.create_ast = Creates ast from str
         self.substitute = Lookup values from ast
         self.evaluate   = Evaluates boolean expression
+        self.compile    = Compiles str into a callable that evaluates a record
+        self.assemble   = Compiles str into a bytecode Program (see bytecode.execute)
+        self.evaluate_frame = Evaluates str against every row of a DataFrame
+        self.to_sql     = Translates str into a parameterised SQL WHERE clause
+        self.specialize = Partially evaluates str for fields with known values
+        self.simplify   = Rewrites str into an equivalent AST that is cheaper to evaluate
         self.parse      = Does all of above.
 
     The main user-facing methods will be BranchingLogicParser.parse()
     """
-    def __create_my_field(self, s: str, loc: int, tokens: pp.ParseResults):
+    def __parse_string_as_list(self, input_string: str):
+        if self.grammar is None:
+            return self.__pratt.parse(input_string)
+        token = _field_table.set(self.field_table)
+        try:
+            return self.grammar.parse_string(input_string).as_list()
+        finally:
+            _field_table.reset(token)
+
+    def __load_or_parse(self, input_string: str):
         """
-        Private method creates a myField object corresponding to a regular REDCap field
+        Loads the AST from the on-disk cache if there is one, parsing and storing it otherwise.
+        The rule's Program is kept for assemble().
         """
-        return myField(tokens[0])
+        if self.stats is not None:
+            self.stats.count("cache_misses")
+        if self.disk_cache is None:
+            return self.__parse_string_as_list(input_string)
+        cached = self.disk_cache.get(input_string, self.field_types)
+        if cached is not None:
+            if self.stats is not None:
+                self.stats.count("disk_cache_hits")
+            self.__programs[input_string] = cached.program
+            # Unpickled fields are interned in the default table
+            if self.field_table is default_field_table:
+                return cached.ast
+            return reintern(cached.ast, self.field_table)
+        ast = self.__parse_string_as_list(input_string)
+        program = self.__programs[input_string] = assemble(ast, field_types=self.field_types)
+        self.disk_cache.put(input_string, ast, program, self.field_types)
+        return ast
 
-    def __create_my_event_field(self, s: str, loc: int, tokens: pp.ParseResults):
-        """
-        Private method creates a myField object corresponding to a REDCap field in event
-        """
-        return myField(tokens[1], event=tokens[0])
-
-    def __create_my_check(self, s: str, loc: int, tokens: pp.ParseResults):
-        """
-        Private method creates a myField object corresponding to a REDCap field checkbox
-        """
-        return myField(tokens[0], event=None, check=tokens[1])
-
-    def __create_my_event_check(self, s: str, loc: int, tokens: pp.ParseResults):
-        """
-        Private method creates a myField object corresponding to REDCap field checkbox in event
+    def __create_ast_as_list(self, input_string: str):
         """
-        return myField(tokens[1], event=tokens[0], check=tokens[2])
-
-    def __redcap_branching_logic_grammar(self):
+        Creates the list-based AST for the given string, consulting the parse cache first.
+        ASTs returned from the cache are shared and must not be modified.
         """
-        This method creates a parser for the REDCap Branching Logic.
-        The grammar for the REDCap Branching logic in Backus-Naur Form (BNF) is defined as follows:
-        
-            expression ::=  atom [ operator atom ]*
-            atom       ::=  variable | value | checkbox | event | varcheck_in_event | variable_in_event | variable_in_check
-            operator   ::=  "=" | "<>" | ">" | ">=" | "<" | "<="
-            variable   ::=  "[" alphabet "]"
-            checkbox   ::=  "(" alphabet ")"
-            event      ::=  "[" alphabet "]"
-            value      ::=  "'" .*? "'" | '"' .*? '"'
-            varcheck_in_event ::= event variable_in_check
-            variable_in_event ::= event variable
-            variable_in_check ::= "[" alphabet checkbox "]"
-        
-        The expression is evaluated using infix notation, with the following operator precedence:
-            1. "!" (not)
-            2. "=" | "<>" | ">" | ">=" | "<" | "<=" (comparison)
-            3. "AND"
-            4. "OR"
-        """
-        # Define the alphabet of our grammar
-        alphabet = pp.Word(pp.alphanums + "_")
-        lbrace = pp.Suppress(pp.Literal('['))
-        rbrace = pp.Suppress(pp.Literal(']'))
-
-        # Define the verbs (i.e. operators) of our grammar
-        operator = pp.oneOf(("=", "<>", ">", ">=", "<", "<=")).set_results_name("operator")
-        and_ = pp.CaselessKeyword("AND").set_results_name("bool")
-        or_  = pp.CaselessKeyword("OR").set_results_name("bool")
-        not_ = pp.Keyword("!").set_results_name("bool")
-
-        # Now we define the variables
-        variable = pp.QuotedString(quote_char="[", end_quote_char="]").set_results_name("variable").set_parse_action(self.__create_my_field)
-        
-        checkbox = pp.QuotedString(quote_char="(", end_quote_char=")").set_results_name("checkbox")
-        event    = pp.QuotedString(quote_char="[", end_quote_char="]").set_results_name("event")
-        value    = (pp.QuotedString(quoteChar='"') | pp.QuotedString(quoteChar="'")).set_results_name("value")
-
-        # REDCap Checkbox events
-        variable_in_check = (lbrace + alphabet.set_results_name("variable_checkbox") + checkbox + rbrace).set_parse_action(self.__create_my_check)
-        variable_in_event = (event + pp.QuotedString(quote_char="[", end_quote_char="]")).set_parse_action(self.__create_my_event_field)
-
-
-        varcheck_in_event = (event + (lbrace + alphabet.set_results_name("variable_checkbox") + checkbox + rbrace)).set_parse_action(self.__create_my_event_check)
-
-        # The expression
-        field = ( varcheck_in_event | variable_in_event | variable_in_check | variable | value)
-        expression = pp.Group(field + operator + value).set_results_name("expression", list_all_matches=True)
-
-        # Define the syntax as infix notation, using variables and operators
-        redcap_branching_logic_grammar = pp.infix_notation(
-            expression,
-            # Define operator list, number of terms, and associativity
-            [
-                (not_, 1, pp.opAssoc.RIGHT),
-                (operator, 2, pp.opAssoc.LEFT),
-                (and_, 2, pp.opAssoc.LEFT),
-                (or_,  2, pp.opAssoc.LEFT),
-            ]
-        )
-        return redcap_branching_logic_grammar
-
-    def __create_ast_as_list(self, input_string: str):
-        return self.grammar.parse_string(input_string).as_list()
+        if self.cache is None:
+            return self.__load_or_parse(input_string)
+        # ASTs hold fields interned in the parser's table, so other tables get their own entries
+        key = input_string if self.field_table is default_field_table else (self.field_table, input_string)
+        return self.cache.get_or_parse(key, lambda: self.__load_or_parse(input_string))
 
-    def __redcap_lookup(self, field_name: str, data_df) -> str:
+    def __redcap_lookup(self, field: myField, data_df) -> str:
         """
         Looks up the value from REDCAP
         """
 
-        return str(data_df[str(field_name)])
+        return str(data_df[lookup_key(field)])
 
     def __field_value_lookup(self, results, data_df):
         scratch = []
@@ -137,6 +233,10 @@ class BranchingLogicParser:
             '>=': op.ge
         }
 
+        # Chains joined by anything but AND/OR are rejected, as by every other evaluator
+        if len(results) > 1 and isinstance(results[0], list):
+            split_chain(results)
+
         for index, result in enumerate(results):
             # If the result is a list, we need to recursively evaluate it
             if isinstance(result, list):
@@ -152,20 +252,27 @@ class BranchingLogicParser:
 
             elif isinstance(result, myField):
                 # Lookup field and evaluate
-                field_name = result.field
                 operator = op_lookup[results[index + 1]]
                 expected = results[index + 2]
 
-                field_value = self.__redcap_lookup(field_name, data_df) # Placeholder
-                field_result = operator(field_value, expected)
+                field_value = self.__redcap_lookup(result, data_df)
+                kind, target = typed_comparison(result, expected, self.field_types)
+                if kind is None:
+                    field_result = operator(field_value, expected)
+                else:
+                    field_result = operator(CONVERTERS[kind](field_value), target)
 
-                print(f"[{field_name}]  {results[index + 1]} {expected}")
-                print(f"{field_value} {results[index + 1]} {expected}")
+                if self.trace is not None:
+                    self.trace(TraceEvent(result, results[index + 1], expected, field_value, field_result))
 
                 # Return value
                 scratch.append(field_result)
                 return scratch
 
+            elif isinstance(result, bool):
+                # A constant left by specialize()
+                scratch.append(result)
+
             elif result in ['AND', 'OR']:
                 scratch.append(result)
         
@@ -213,23 +320,120 @@ class BranchingLogicParser:
                 
         return stack[0]
 
-    def __parse(self, input_string: str):
-        ast_as_list  = self.__create_ast_as_list(input_string)
-        boolean_expr = self.__field_value_lookup(ast_as_list)
-        expr_result  = self.__boolean_expr_evaluate(boolean_expr)
+    def __compile(self, input_string: str) -> CompiledRule:
+        """
+        Compiles the branching logic string into a callable that evaluates a record.
+        """
+        return compile_ast(self.create_ast(input_string), self.field_types, trace=self.trace)
 
-        return expr_result
+    def __assemble(self, input_string: str) -> Program:
+        """
+        Compiles the branching logic string into a serialisable bytecode Program. With an
+        on-disk cache, the Program loaded or stored along with the AST is reused.
+        """
+        ast = self.create_ast(input_string)
+        program = self.__programs.get(input_string)
+        if program is None:
+            # Not loaded by this parser (e.g. the AST came from a shared parse cache)
+            program = assemble(ast, field_types=self.field_types)
+        return program
+
+    def __to_sql(self, input_string: str, **options) -> SQLPredicate:
+        """
+        Translates the branching logic string into a parameterised SQL predicate (see sql.to_sql).
+        """
+        options.setdefault("field_types", self.field_types)
+        return to_sql(self.create_ast(input_string), **options)
 
-    def __init__(self) -> None:
+    def __evaluate_frame(self, input_string: str, data_df):
+        """
+        Evaluates the branching logic string against every row of a DataFrame at once.
+        """
+        return evaluate_frame(self.create_ast(input_string), data_df, self.field_types)
+
+    def __specialize(self, input_string: str, known_values: Mapping) -> list:
+        """
+        Partially evaluates the branching logic string for fields with known values (see specialize.specialize).
+        """
+        return specialize(self.create_ast(input_string), known_values, self.field_types)
+
+    def __simplify(self, input_string: str) -> list:
+        """
+        Simplifies the branching logic string's AST and orders its operands by cost (see optimize.simplify).
+        """
+        return simplify(self.create_ast(input_string))
+
+    def __parse(self, input_string: str, data_df) -> bool:
+        return self.compile(input_string)(data_df)
+
+    def __init__(
+        self,
+        cache: Union[ParseCache, None] = default_parse_cache,
+        backend: str = "pyparsing",
+        field_table: FieldTable = default_field_table,
+        disk_cache: Union[CompiledRuleCache, None] = None,
+        field_types: Union[Mapping[str, str], None] = None,
+        instrument: bool = False,
+        trace: Union[Tracer, None] = None,
+    ) -> None:
         """
         Initialise class instance
+
+        cache : Union[ParseCache, None]
+            LRU cache of parsed ASTs keyed by branching logic string. Defaults to the cache
+            shared by the whole process; pass a private ParseCache to size it independently,
+            or None to disable caching.
+        backend : str
+            "pyparsing" (default) parses with the pyparsing grammar. "pratt" uses the
+            hand-written parser in pratt.py, which yields the same ASTs without backtracking
+            and raises BranchingLogicSyntaxError instead of pyparsing.ParseException.
+        field_table : FieldTable
+            The table myField objects in the ASTs are interned in. Defaults to the table
+            shared by the whole process; pass a FieldTable per project to keep them apart.
+        disk_cache : Union[CompiledRuleCache, None]
+            Persistent cache of compiled rules consulted when the in-memory cache misses, so
+            that a new process can load rules instead of parsing them. Disabled by default.
+        field_types : Union[Mapping[str, str], None]
+            The comparison type of numeric and date fields (see data_dictionary.field_types),
+            used by compile() and evaluate_frame(). By default every comparison is on strings.
+        instrument : bool
+            Record per-phase wall time, call counts, cache hits, lookups, and AST sizes in
+            self.stats (see instrumentation.ParserInstrumentation), read with
+            self.stats.snapshot() and zeroed with self.stats.reset(). Off by default, when
+            self.stats is None and the parser runs without any instrumentation code.
+        trace : Union[Tracer, None]
+            Called with a TraceEvent (field, operator, expected value, looked-up value, and
+            result) for every comparison substitute() and compiled rules make, e.g.
+            trace.log_trace() to log them. Rules compiled without a tracer carry no tracing code.
         """
-        self.grammar    = self.__redcap_branching_logic_grammar()
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        self.backend    = backend
+        self.cache      = cache
+        self.field_table = field_table
+        self.disk_cache = disk_cache
+        # Programs of the rules this parser loaded from or stored in the disk cache, by logic string
+        self.__programs: Dict[str, Program] = {}
+        self.field_types = field_types or {}
+        self.trace      = trace
+        self.grammar    = redcap_branching_logic_grammar() if backend == "pyparsing" else None
+        self.__pratt    = PrattParser(field_table)
         self.create_ast = self.__create_ast_as_list
         self.substitute = self.__field_value_lookup
         self.evaluate   = self.__boolean_expr_evaluate
+        self.compile    = self.__compile
+        self.assemble   = self.__assemble
+        self.evaluate_frame = self.__evaluate_frame
+        self.to_sql     = self.__to_sql
+        self.specialize = self.__specialize
+        self.simplify   = self.__simplify
         self.parse      = self.__parse
 
+        self.stats: Union[ParserInstrumentation, None] = None
+        if instrument:
+            self.stats = ParserInstrumentation()
+            self.stats.install(self)
+
     def print_ast(self, parse_results, depth=0) -> None:
         """
         Print the abstract syntax tree (AST) for the given parse results.
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+"""
+Lowering of list-based ASTs into a flat postfix instruction array, and the stack machine
+that runs it.
+
+A Program is two tuples: `code`, a flat sequence of (opcode, argument) integer pairs, and
+`constants`, the field keys and literal values the arguments index into. Programs contain
+only ints, floats, strs, and bools, so they pickle (or JSON-encode) compactly and can be
+shipped to worker processes or stored, unlike compiled closures.
+
+Comparisons on numeric and date fields (see compiler.compile_ast) load the field with
+LOAD_NUMBER or LOAD_DATE, which convert the value to a float, and compare it against the
+literal converted once, when the rule is assembled.
+
+AND and OR are lowered to conditional jumps, which makes them short-circuit:
+    a AND b     a, JUMP_IF_FALSE end, b, end:
+    a OR b      a, JUMP_IF_TRUE end, b, end:
+The jumps leave the deciding value on the stack when taken and pop it otherwise.
+"""
+
+import operator as op
+from typing import List, Mapping, NamedTuple, Tuple, Union
+from .myfield import myField
+from .columns import ColumnTable
+from .coercion import NUMBER, to_number, to_date, typed_comparison
+from .logic_ast import COMPARISON_OPERATORS, root, is_constant, is_comparison, is_negation, split_chain, lookup_key
+
+# Opcodes. The comparisons are numbered contiguously so the VM can test them with one range check.
+CMP_EQ, CMP_NE, CMP_LT, CMP_GT, CMP_LE, CMP_GE = range(6)
+LOAD_FIELD    = 6
+LOAD_CONST    = 7
+NOT           = 8
+JUMP_IF_FALSE = 9
+JUMP_IF_TRUE  = 10
+LOAD_NUMBER   = 11
+LOAD_DATE     = 12
+
+OPCODE_NAMES: Tuple[str, ...] = (
+    "CMP_EQ", "CMP_NE", "CMP_LT", "CMP_GT", "CMP_LE", "CMP_GE",
+    "LOAD_FIELD", "LOAD_CONST", "NOT", "JUMP_IF_FALSE", "JUMP_IF_TRUE",
+    "LOAD_NUMBER", "LOAD_DATE",
+)
+
+_COMPARISON_OPCODES = {'=': CMP_EQ, "<>": CMP_NE, '<': CMP_LT, ">": CMP_GT, '<=': CMP_LE, '>=': CMP_GE}
+_COMPARE = (op.eq, op.ne, op.lt, op.gt, op.le, op.ge)
+
+class Program(NamedTuple):
+    """
+    A compiled rule: flat (opcode, argument) pairs and the constants they refer to.
+    """
+    code: Tuple[int, ...]
+    constants: Tuple
+
+class _Assembler:
+    def __init__(self, resolve, field_types: Mapping[str, str]) -> None:
+        self.resolve = resolve
+        self.field_types = field_types
+        self.code: List[int] = []
+        self.constants: List = []
+        self.__constant_index: dict = {}
+
+    def constant(self, value) -> int:
+        # Keyed by type too, so that True and 1 never share a slot
+        key = (type(value), value)
+        if key not in self.__constant_index:
+            self.__constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return self.__constant_index[key]
+
+    def emit(self, opcode: int, argument: int = 0) -> int:
+        self.code += (opcode, argument)
+        return len(self.code) - 1
+
+    def lower(self, node: list) -> None:
+        if is_comparison(node):
+            lhs, symbol, expected = node
+            if isinstance(lhs, myField):
+                kind, target = typed_comparison(lhs, expected, self.field_types)
+                if kind is None:
+                    self.emit(LOAD_FIELD, self.constant(self.resolve(lhs)))
+                    self.emit(LOAD_CONST, self.constant(expected))
+                else:
+                    self.emit(LOAD_NUMBER if kind == NUMBER else LOAD_DATE, self.constant(self.resolve(lhs)))
+                    self.emit(LOAD_CONST, self.constant(target))
+                self.emit(_COMPARISON_OPCODES[symbol])
+            else:
+                # Comparisons between two literals are folded
+                self.emit(LOAD_CONST, self.constant(COMPARISON_OPERATORS[symbol](lhs, expected)))
+        elif is_constant(node):
+            self.emit(LOAD_CONST, self.constant(node[0]))
+        elif is_negation(node):
+            self.lower(node[1])
+            self.emit(NOT)
+        else:
+            operator, operands = split_chain(node)
+            jump = JUMP_IF_FALSE if operator == 'AND' else JUMP_IF_TRUE
+            patches = []
+            for operand in operands[:-1]:
+                self.lower(operand)
+                patches.append(self.emit(jump))
+            self.lower(operands[-1])
+            # Every jump lands just past the last operand
+            for argument_index in patches:
+                self.code[argument_index] = len(self.code)
+
+def assemble(
+    ast: list,
+    columns: Union[ColumnTable, None] = None,
+    field_types: Union[Mapping[str, str], None] = None,
+) -> Program:
+    """
+    Lower a list-based AST into a Program.
+
+    Args:
+        ast (list): An AST as returned by BranchingLogicParser.create_ast().
+        columns (ColumnTable, optional): Load fields by column position, for records held as
+            rows of an export. By default they are loaded by column name.
+        field_types (Mapping[str, str], optional): The comparison type of numeric and date
+            fields (see compiler.compile_ast), compared as converted values instead of strings.
+    Returns:
+        Program: The flat, serialisable compiled form, run with execute().
+    """
+    assembler = _Assembler(lookup_key if columns is None else columns.key, field_types or {})
+    assembler.lower(root(ast))
+    return Program(tuple(assembler.code), tuple(assembler.constants))
+
+def execute(program: Program, record: Mapping) -> bool:
+    """
+    Run a Program against a record on a stack machine, without recursion.
+    """
+    code, constants = program
+    stack: list = []
+    push = stack.append
+    pc = 0
+    end = len(code)
+    while pc < end:
+        opcode = code[pc]
+        argument = code[pc + 1]
+        pc += 2
+        if opcode == LOAD_FIELD:
+            push(str(record[constants[argument]]))
+        elif opcode == LOAD_CONST:
+            push(constants[argument])
+        elif opcode <= CMP_GE:
+            right = stack.pop()
+            stack[-1] = _COMPARE[opcode](stack[-1], right)
+        elif opcode == JUMP_IF_FALSE:
+            if stack[-1]:
+                stack.pop()
+            else:
+                pc = argument
+        elif opcode == JUMP_IF_TRUE:
+            if stack[-1]:
+                pc = argument
+            else:
+                stack.pop()
+        elif opcode == LOAD_NUMBER:
+            push(to_number(record[constants[argument]]))
+        elif opcode == LOAD_DATE:
+            push(to_date(record[constants[argument]]))
+        else:
+            stack[-1] = not stack[-1]
+    return stack[-1]
+
+def disassemble(program: Program) -> str:
+    """
+    Render a Program as one instruction per line, for debugging.
+    """
+    code, constants = program
+    lines = []
+    for pc in range(0, len(code), 2):
+        opcode, argument = code[pc], code[pc + 1]
+        name = OPCODE_NAMES[opcode]
+        if opcode in (LOAD_FIELD, LOAD_CONST, LOAD_NUMBER, LOAD_DATE):
+            lines.append(f"{pc:4d} {name:<14}{constants[argument]!r}")
+        elif opcode in (JUMP_IF_FALSE, JUMP_IF_TRUE):
+            lines.append(f"{pc:4d} {name:<14}{argument}")
+        else:
+            lines.append(f"{pc:4d} {name}")
+    return "\n".join(lines)
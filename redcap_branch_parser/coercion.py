@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+"""
+Typed comparison support: converting record values and literals to numbers or dates.
+
+Both kinds are converted to floats (dates to seconds since 1970-01-01), with values that do
+not convert becoming NaN, so ordering comparisons against them are False and "<>" is True.
+Values are stringified first, so a cell converts the same way whichever evaluator reads it.
+"""
+
+import math
+from datetime import datetime
+from typing import Callable, Dict, Mapping, Tuple, Union
+from .myfield import myField
+
+NUMBER: str = "number"
+DATE: str = "date"
+
+_EPOCH = datetime(1970, 1, 1)
+
+def to_number(value) -> float:
+    try:
+        return float(str(value))
+    except ValueError:
+        return math.nan
+
+def to_date(value) -> float:
+    try:
+        return (datetime.fromisoformat(str(value).strip()) - _EPOCH).total_seconds()
+    except (ValueError, TypeError):
+        # TypeError: timezone-aware values cannot be compared with the naive epoch
+        return math.nan
+
+CONVERTERS: Dict[str, Callable[[object], float]] = {NUMBER: to_number, DATE: to_date}
+
+def convert_literal(literal: str, kind: str) -> Union[float, None]:
+    """
+    Convert a branching logic literal for a typed comparison, or None if it does not convert
+    (e.g. [age] = ''), in which case the comparison stays a string comparison.
+    """
+    converted = CONVERTERS[kind](literal)
+    return None if math.isnan(converted) else converted
+
+def typed_comparison(field: myField, literal: str, field_types: Mapping[str, str]) -> Tuple[Union[str, None], Union[float, None]]:
+    """
+    Decide how a comparison of a field against a literal is made: returns the comparison type
+    and converted literal, or (None, None) if it is a plain string comparison.
+    """
+    # Checkbox choices are always "0" or "1", whatever the type of their field
+    kind = field_types.get(field.field) if field.check is None else None
+    if kind is None:
+        return None, None
+    target = convert_literal(literal, kind)
+    if target is None:
+        return None, None
+    return kind, target
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import pandas as pd
+from typing import Dict, Iterable, List, Union
+from . import data_dictionary
+from .encoding import parse_choices
+from .events import EVENT_COLUMN
+from .logic_ast import LookupKey, checkbox_column, lookup_key
+from .myfield import myField
+
+class ColumnTable:
+    """
+    This class resolves field references to column positions in a REDCap export, so that
+    rules can read records held as rows (tuples, lists, or arrays, e.g. from csv.reader or
+    DataFrame.itertuples(index=False)) by index instead of by name.
+
+    Checkbox references [field(code)] resolve to the position of their field___code column,
+    and [event][field] references to (event, position). Each myField is resolved once.
+
+    columns : Iterable[str]
+        The export's column names, in order.
+    """
+    def __init__(self, columns: Iterable[str]) -> None:
+        self.columns: List[str] = list(columns)
+        self.positions: Dict[str, int] = {name: position for position, name in enumerate(self.columns)}
+        self.__keys: Dict[myField, LookupKey] = {}
+
+    @classmethod
+    def from_data_dictionary(cls, df_datadict: pd.DataFrame, longitudinal: bool = False) -> "ColumnTable":
+        """
+        The columns REDCap exports for a data dictionary: one per field in data dictionary order,
+        with checkbox fields expanded into one column per choice, a form_complete column after
+        each form (if the data dictionary has a form_name column), and for longitudinal projects
+        redcap_event_name after the record ID field. Descriptive fields export no column.
+        """
+        fields = data_dictionary.field_names(df_datadict)
+        forms = data_dictionary.column(df_datadict, "form_name")
+        field_types = data_dictionary.column(df_datadict, "field_type")
+        choices_column = data_dictionary.column(df_datadict, "select_choices_or_calculations")
+
+        columns: List[str] = []
+        previous_form = None
+        for field, form, field_type, choices in zip(fields, forms, field_types, choices_column):
+            if previous_form is not None and form != previous_form:
+                columns.append(f"{previous_form}_complete")
+            previous_form = form if isinstance(form, str) else None
+            if field_type == "descriptive":
+                continue
+            if field_type == "checkbox" and isinstance(choices, str):
+                columns.extend(checkbox_column(field, code) for code in parse_choices(choices))
+            else:
+                columns.append(field)
+            if longitudinal and len(columns) == 1:
+                columns.append(EVENT_COLUMN)
+        if previous_form is not None:
+            columns.append(f"{previous_form}_complete")
+        return cls(columns)
+
+    def key(self, field: myField) -> Union[int, tuple]:
+        """
+        The position of the column a field reference reads, or (event, position) for
+        references to another event.
+
+        Raises:
+            KeyError: If the export has no such column.
+        """
+        try:
+            return self.__keys[field]
+        except KeyError:
+            pass
+        name = lookup_key(field)
+        if isinstance(name, tuple):
+            event, column = name
+            resolved = (event, self.__position(column))
+        else:
+            resolved = self.__position(name)
+        self.__keys[field] = resolved
+        return resolved
+
+    def __position(self, column: str) -> int:
+        try:
+            return self.positions[column]
+        except KeyError:
+            raise KeyError(f"No column '{column}' in the export") from None
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __repr__(self) -> str:
+        return f"ColumnTable(columns={len(self.columns)})"
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+from typing import Callable, Mapping, Union
+from .columns import ColumnTable
+from .trace import Tracer, TraceEvent
+from .myfield import myField
+from .coercion import CONVERTERS, typed_comparison
+from .logic_ast import COMPARISON_OPERATORS, LookupKey, root, is_constant, is_comparison, is_negation, split_chain, lookup_key
+
+CompiledRule = Callable[[Mapping], bool]
+KeyResolver = Callable[[myField], LookupKey]
+
+class _RuleCompiler:
+    def __init__(self, field_types: Mapping[str, str], resolve: KeyResolver, trace: Union[Tracer, None]) -> None:
+        self.field_types = field_types
+        self.resolve = resolve
+        self.trace = trace
+
+    def comparison(self, node: list) -> CompiledRule:
+        lhs, symbol, expected = node
+        compare = COMPARISON_OPERATORS[symbol]
+
+        # A comparison between two quoted values never depends on the record
+        if not isinstance(lhs, myField):
+            constant = compare(lhs, expected)
+            return lambda record: constant
+
+        key = self.resolve(lhs)
+
+        # Numeric and date fields compare converted values against a literal converted once, here
+        kind, target = typed_comparison(lhs, expected, self.field_types)
+        if self.trace is not None:
+            return self.traced_comparison(lhs, symbol, expected, key, kind, target)
+        if kind is not None:
+            convert = CONVERTERS[kind]
+            def converted_comparison(record: Mapping) -> bool:
+                return compare(convert(record[key]), target)
+            return converted_comparison
+
+        def comparison(record: Mapping) -> bool:
+            return compare(str(record[key]), expected)
+        return comparison
+
+    def traced_comparison(self, field: myField, symbol: str, expected: str, key, kind, target) -> CompiledRule:
+        compare = COMPARISON_OPERATORS[symbol]
+        convert = CONVERTERS[kind] if kind is not None else str
+        operand = target if kind is not None else expected
+        trace = self.trace
+
+        def traced_comparison(record: Mapping) -> bool:
+            value = record[key]
+            result = compare(convert(value), operand)
+            trace(TraceEvent(field, symbol, expected, value, result))
+            return result
+        return traced_comparison
+
+    def negation(self, node: list) -> CompiledRule:
+        operand = self.node(node[1])
+        return lambda record: not operand(record)
+
+    def chain(self, node: list) -> CompiledRule:
+        operator, operands = split_chain(node)
+        compiled = tuple(self.node(operand) for operand in operands)
+
+        # Two-operand chains are by far the most common, so bind them directly
+        if len(compiled) == 2:
+            left, right = compiled
+            if operator == 'AND':
+                return lambda record: left(record) and right(record)
+            return lambda record: left(record) or right(record)
+
+        if operator == 'AND':
+            return lambda record: all(rule(record) for rule in compiled)
+        return lambda record: any(rule(record) for rule in compiled)
+
+    def node(self, node: list) -> CompiledRule:
+        if is_comparison(node):
+            return self.comparison(node)
+        if is_constant(node):
+            constant = node[0]
+            return lambda record: constant
+        if is_negation(node):
+            return self.negation(node)
+        return self.chain(node)
+
+def compile_ast(
+    ast: list,
+    field_types: Union[Mapping[str, str], None] = None,
+    columns: Union[ColumnTable, None] = None,
+    trace: Union[Tracer, None] = None,
+) -> CompiledRule:
+    """
+    Compile a list-based AST into a tree of pre-bound closures.
+
+    Operators are resolved and record keys computed once, here, so evaluating the returned
+    callable against a record (any Mapping from field name to value) is only a handful of
+    function calls. AND and OR short-circuit from left to right.
+
+    Args:
+        ast (list): An AST as returned by BranchingLogicParser.create_ast().
+        field_types (Mapping[str, str], optional): The comparison type (coercion.NUMBER or
+            coercion.DATE) of numeric and date fields, e.g. from data_dictionary.field_types().
+            Their comparisons are made on converted values instead of strings.
+        columns (ColumnTable, optional): Look fields up by column position, for records held
+            as rows of an export. By default they are looked up by column name.
+        trace (Tracer, optional): Called with a TraceEvent for every comparison evaluated.
+            Only rules compiled with a tracer contain tracing code.
+    Returns:
+        Callable[[Mapping], bool]: The compiled rule.
+    """
+    resolve = lookup_key if columns is None else columns.key
+    return _RuleCompiler(field_types or {}, resolve, trace).node(root(ast))
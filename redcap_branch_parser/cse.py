@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from typing import Dict, Hashable, List, Mapping, NamedTuple, Union
+from .compiler import CompiledRule, compile_ast
+from .frame import FrameEvaluator
+from .logic_ast import NOT, root, is_constant, is_comparison, is_negation, split_chain
+
+class SharingInfo(NamedTuple):
+    """
+    How much a rule set shares: the AST nodes of all its rules, the distinct nodes left after
+    hash-consing, and their ratio (nodes / unique, 1.0 when nothing is shared).
+    """
+    nodes: int
+    unique: int
+    ratio: float
+
+class SharedExpressions:
+    """
+    This class hash-conses the ASTs of a rule set, so that structurally identical subtrees
+    (comparisons, negations, and AND/OR chains) appearing in several rules are stored once,
+    as nodes of a DAG, and evaluated once per record or per batch.
+
+    Nodes are numbered children first, so evaluating them in order always finds the results
+    of a node's operands already computed.
+
+    rules : Mapping[Hashable, list]
+        ASTs keyed by rule name, as returned by BranchingLogicParser.create_ast().
+    field_types : Union[Mapping[str, str], None]
+        The comparison type of numeric and date fields (see compiler.compile_ast).
+    """
+    def __init__(self, rules: Mapping[Hashable, list], field_types: Union[Mapping[str, str], None] = None) -> None:
+        self.field_types: Mapping[str, str] = field_types or {}
+        # ('cmp', comparison node), ('const', bool), ('!', operand), or ('AND' | 'OR', operands), by node number
+        self.nodes: List[tuple] = []
+        self.roots: Dict[Hashable, int] = {}
+        self.total_nodes: int = 0
+        self.__numbers: Dict[tuple, int] = {}
+        self.__comparisons: Dict[int, CompiledRule] = {}
+        for name, ast in rules.items():
+            self.roots[name] = self.__intern(root(ast))
+
+    def __intern(self, node: list) -> int:
+        self.total_nodes += 1
+        if is_comparison(node):
+            key = ("cmp", *node)
+            stored = ("cmp", node)
+        elif is_constant(node):
+            key = stored = ("const", node[0])
+        elif is_negation(node):
+            key = stored = (NOT, self.__intern(node[1]))
+        else:
+            operator, operands = split_chain(node)
+            key = stored = (operator, tuple(self.__intern(operand) for operand in operands))
+
+        number = self.__numbers.get(key)
+        if number is None:
+            number = self.__numbers[key] = len(self.nodes)
+            self.nodes.append(stored)
+        return number
+
+    def info(self) -> SharingInfo:
+        unique = len(self.nodes)
+        return SharingInfo(self.total_nodes, unique, self.total_nodes / unique if unique else 1.0)
+
+    def evaluate_frame(self, evaluator: FrameEvaluator) -> Dict[Hashable, np.ndarray]:
+        """
+        Evaluate every rule over a DataFrame, computing each distinct node once.
+
+        Args:
+            evaluator (FrameEvaluator): The evaluator of the DataFrame, which computes the comparisons.
+        Returns:
+            Dict[Hashable, np.ndarray]: One boolean per row, for each rule.
+        """
+        results: List[np.ndarray] = []
+        for kind, argument in self.nodes:
+            if kind == "cmp":
+                result = evaluator.evaluate_node(argument)
+            elif kind == "const":
+                result = np.full(len(evaluator.data_df), argument, dtype=bool)
+            elif kind == NOT:
+                result = ~results[argument]
+            else:
+                combine = np.logical_and if kind == 'AND' else np.logical_or
+                result = combine.reduce([results[operand] for operand in argument])
+            results.append(result)
+        return {name: results[number] for name, number in self.roots.items()}
+
+    def evaluate_record(self, record: Mapping) -> Dict[Hashable, bool]:
+        """
+        Evaluate every rule against a record, computing each distinct node at most once.
+        AND and OR short-circuit, so nodes no rule needed are never computed.
+        """
+        nodes = self.nodes
+        memo: List[Union[bool, None]] = [None] * len(nodes)
+
+        def evaluate(number: int) -> bool:
+            result = memo[number]
+            if result is not None:
+                return result
+            kind, argument = nodes[number]
+            if kind == "cmp":
+                result = self.__comparison(number)(record)
+            elif kind == "const":
+                result = argument
+            elif kind == NOT:
+                result = not evaluate(argument)
+            elif kind == 'AND':
+                result = all(evaluate(operand) for operand in argument)
+            else:
+                result = any(evaluate(operand) for operand in argument)
+            memo[number] = result
+            return result
+
+        return {name: evaluate(number) for name, number in self.roots.items()}
+
+    def __comparison(self, number: int) -> CompiledRule:
+        try:
+            return self.__comparisons[number]
+        except KeyError:
+            compiled = self.__comparisons[number] = compile_ast(self.nodes[number][1], self.field_types)
+            return compiled
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __repr__(self) -> str:
+        nodes, unique, ratio = self.info()
+        return f"SharedExpressions(rules={len(self.roots)}, nodes={nodes}, unique={unique}, ratio={ratio:.2f})"
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+"""
+Helpers for reading REDCap data dictionaries (exported metadata).
+"""
+
+import pandas as pd
+from typing import Dict, List, Union
+from .coercion import NUMBER, DATE
+
+def field_names(df_datadict: pd.DataFrame) -> List[str]:
+    """
+    The data dictionary's field names, whether they are the index (as exported by PyCap's
+    export_metadata(format_type="df")) or a regular "field_name" column.
+    """
+    if "field_name" in df_datadict.columns:
+        return [str(name) for name in df_datadict["field_name"]]
+    return [str(name) for name in df_datadict.index]
+
+def column(df_datadict: pd.DataFrame, name: str) -> pd.Series:
+    """
+    A data dictionary column, or all-missing values if the export does not include it.
+    """
+    if name in df_datadict.columns:
+        return df_datadict[name]
+    return pd.Series(None, index=df_datadict.index, dtype=object)
+
+def comparison_type(field_type, validation) -> Union[str, None]:
+    """
+    How a field's values compare: NUMBER, DATE, or None for plain strings.
+    """
+    if field_type in ("calc", "slider"):
+        return NUMBER
+    if not isinstance(validation, str):
+        return None
+    if validation == "integer" or validation.startswith("number"):
+        return NUMBER
+    if validation.startswith(("date_", "datetime_")):
+        return DATE
+    return None
+
+def field_types(df_datadict: pd.DataFrame) -> Dict[str, str]:
+    """
+    The comparison type of every numeric or date field, from the field_type and
+    text_validation_type_or_show_slider_number columns. Other fields are omitted.
+    """
+    types = {}
+    for field, field_type, validation in zip(
+        field_names(df_datadict),
+        column(df_datadict, "field_type"),
+        column(df_datadict, "text_validation_type_or_show_slider_number"),
+    ):
+        kind = comparison_type(field_type, validation)
+        if kind is not None:
+            types[field] = kind
+    return types
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+from typing import Dict, Hashable, Mapping, MutableMapping, Set, Union
+from .branching_logic_parser import BranchingLogicParser
+from .compiler import CompiledRule, compile_ast
+from .logic_ast import root, iter_fields, lookup_key
+from .myfield import myField
+from .plan import VisibilityPlan
+
+class IncrementalEvaluator:
+    """
+    This class keeps the results of a set of rules for a set of records, and re-evaluates only
+    the rules that depend on a field when that field changes.
+
+    It holds a reverse index from every referenced myField (field, event, check) to the rules
+    that mention it, and from every record key to the myFields looked up through it.
+
+    rules : Mapping[str, list]
+        ASTs keyed by rule name (typically the name of the field whose visibility they decide).
+    records : Mapping[Hashable, MutableMapping]
+        The records keyed by record ID, each mapping field name to value. They are updated in place.
+    field_types : Union[Mapping[str, str], None]
+        The comparison type of numeric and date fields (see compiler.compile_ast).
+    """
+    def __init__(
+        self,
+        rules: Mapping[str, list],
+        records: Mapping[Hashable, MutableMapping],
+        field_types: Union[Mapping[str, str], None] = None,
+    ) -> None:
+        self.records: Mapping[Hashable, MutableMapping] = records
+        self.field_types: Mapping[str, str] = field_types or {}
+        self.compiled: Dict[str, CompiledRule] = {
+            name: compile_ast(ast, self.field_types) for name, ast in rules.items()
+        }
+
+        self.dependents: Dict[myField, Set[str]] = {}
+        self.__fields_by_key: Dict[str, Set[myField]] = {}
+        for name, ast in rules.items():
+            for field in iter_fields(root(ast)):
+                self.dependents.setdefault(field, set()).add(name)
+                self.__fields_by_key.setdefault(lookup_key(field), set()).add(field)
+
+        self.results: Dict[Hashable, Dict[str, bool]] = {
+            record_id: {name: rule(record) for name, rule in self.compiled.items()}
+            for record_id, record in records.items()
+        }
+
+    @classmethod
+    def from_plan(cls, plan: VisibilityPlan, records: Mapping[Hashable, MutableMapping]) -> "IncrementalEvaluator":
+        """
+        Track the visibility of every field of a plan that has branching logic.
+        """
+        rules = {field: plan.expressions[logic] for field, logic in plan.field_logic.items() if logic is not None}
+        return cls(rules, records, plan.field_types)
+
+    @classmethod
+    def from_strings(
+        cls,
+        rules: Mapping[str, str],
+        records: Mapping[Hashable, MutableMapping],
+        parser: Union[BranchingLogicParser, None] = None,
+        field_types: Union[Mapping[str, str], None] = None,
+    ) -> "IncrementalEvaluator":
+        """
+        Parse branching logic strings keyed by rule name and track them. Unless given, field
+        types are the parser's.
+        """
+        if parser is None:
+            parser = BranchingLogicParser()
+        if field_types is None:
+            field_types = parser.field_types
+        return cls({name: parser.create_ast(logic) for name, logic in rules.items()}, records, field_types)
+
+    def affected_rules(self, changed_keys) -> Set[str]:
+        """
+        The rules that look up any of the given record keys.
+        """
+        affected: Set[str] = set()
+        for key in changed_keys:
+            for field in self.__fields_by_key.get(key, ()):
+                affected |= self.dependents[field]
+        return affected
+
+    def update(self, record_id: Hashable, changed_fields: Mapping[str, object]) -> Dict[str, bool]:
+        """
+        Apply changed values to a record and re-evaluate only the rules that depend on them.
+
+        Args:
+            record_id (Hashable): The record to change.
+            changed_fields (Mapping[str, object]): New values keyed by field name.
+        Returns:
+            Dict[str, bool]: The new result of every rule whose result changed.
+        """
+        record = self.records[record_id]
+        record.update(changed_fields)
+
+        results = self.results[record_id]
+        diff: Dict[str, bool] = {}
+        for name in self.affected_rules(changed_fields):
+            result = self.compiled[name](record)
+            if result != results[name]:
+                results[name] = result
+                diff[name] = result
+        return diff
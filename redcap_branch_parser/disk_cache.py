@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from typing import Mapping, NamedTuple, Union
+from .bytecode import Program
+from .myfield import myField, FieldTable
+
+# Bump whenever the AST or bytecode format changes, so stale entries are never loaded
+PARSER_VERSION = "4"
+
+class CachedRule(NamedTuple):
+    """
+    A cached rule: its list-based AST and its bytecode Program.
+    """
+    ast: list
+    program: Program
+
+def reintern(node, field_table: FieldTable):
+    """
+    Copy an AST, interning its fields in the given table.
+    """
+    if isinstance(node, list):
+        return [reintern(child, field_table) for child in node]
+    if isinstance(node, myField):
+        return field_table.intern(node.field, node.event, node.check)
+    return node
+
+class CompiledRuleCache:
+    """
+    This class persists compiled rules in an SQLite file, so a service can load a large data
+    dictionary's rules at start-up instead of parsing every branching logic string again.
+
+    Entries are keyed by a hash of the parser version, the logic string, and the field types
+    the Program was assembled with, and hold the pickled AST and Program. Only open cache files you trust: loading them unpickles data.
+    The file is safe to share between threads and processes.
+
+    path : Union[str, os.PathLike]
+        The SQLite file, created if it does not exist.
+    version : str
+        Entries written under another version are ignored. Defaults to PARSER_VERSION.
+    """
+    def __init__(self, path: Union[str, os.PathLike], version: str = PARSER_VERSION) -> None:
+        self.path = path
+        self.version: str = version
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(os.fspath(path), check_same_thread=False)
+        with self.__connection:
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("PRAGMA synchronous=NORMAL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS compiled_rules (key TEXT PRIMARY KEY, logic TEXT NOT NULL, payload BLOB NOT NULL)"
+            )
+
+    def __key(self, logic: str, field_types: Union[Mapping[str, str], None]) -> str:
+        key = f"{self.version}\0{logic}"
+        if field_types:
+            key += "".join(f"\0{field}={kind}" for field, kind in sorted(field_types.items()))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, logic: str, field_types: Union[Mapping[str, str], None] = None) -> Union[CachedRule, None]:
+        """
+        The cached rule for a logic string and field types, or None if there is no usable entry.
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT payload FROM compiled_rules WHERE key = ?", (self.__key(logic, field_types),)
+            ).fetchone()
+        if row is not None:
+            try:
+                rule = CachedRule(*pickle.loads(row[0]))
+            except Exception:
+                # An unreadable entry is just a miss; it is overwritten on the next put()
+                rule = None
+            if rule is not None:
+                self.hits += 1
+                return rule
+        self.misses += 1
+        return None
+
+    def put(self, logic: str, ast: list, program: Program, field_types: Union[Mapping[str, str], None] = None) -> None:
+        """
+        Store a rule's AST and the Program assembled from it with the given field types.
+        """
+        payload = pickle.dumps((ast, program), protocol=pickle.HIGHEST_PROTOCOL)
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO compiled_rules (key, logic, payload) VALUES (?, ?, ?)",
+                (self.__key(logic, field_types), logic, payload),
+            )
+
+    def clear(self) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.execute("DELETE FROM compiled_rules")
+        self.hits = self.misses = 0
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return self.__connection.execute("SELECT COUNT(*) FROM compiled_rules").fetchone()[0]
+
+    def __enter__(self) -> "CompiledRuleCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+def parse_choices(choices: str) -> List[str]:
+    """
+    The coded values of a select_choices_or_calculations cell, e.g. "1, Yes | 2, No" -> ["1", "2"].
+    """
+    codes = []
+    for choice in choices.split("|"):
+        code = choice.split(",", 1)[0].strip()
+        if code:
+            codes.append(code)
+    return codes
+
+def _smallest_code_dtype(size: int) -> type:
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+def encode_values(values: pd.Series, categories: List[str] = ()) -> Tuple[np.ndarray, List[str]]:
+    """
+    Dictionary-encode a column by stringified value.
+
+    Args:
+        values (pd.Series): The column to encode.
+        categories (List[str]): Values given the first codes, in order. Values found in the
+            column but not listed here are appended in order of appearance.
+    Returns:
+        Tuple[np.ndarray, List[str]]: The smallest-integer codes and the categories they index.
+    """
+    categories = list(categories)
+    positions = {category: position for position, category in enumerate(categories)}
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    remap = np.empty(len(uniques), dtype=np.int64)
+    for unique_code, value in enumerate(uniques):
+        # Distinct raw values may stringify alike (e.g. 1 and "1"), and then share a code
+        value = str(value)
+        if value not in positions:
+            positions[value] = len(categories)
+            categories.append(value)
+        remap[unique_code] = positions[value]
+
+    dtype = _smallest_code_dtype(len(categories))
+    return remap[codes].astype(dtype, copy=False), categories
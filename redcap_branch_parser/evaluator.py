@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+from typing import Mapping, Union
+from .myfield import myField
+from .columns import ColumnTable
+from .coercion import CONVERTERS, typed_comparison
+from .logic_ast import COMPARISON_OPERATORS, root, is_constant, is_comparison, is_negation, split_chain, lookup_key, count_lookups
+
+class LookupCounter:
+    """
+    This class counts the record lookups performed and avoided by evaluate_ast().
+
+    performed : int
+        Lookups that were actually made.
+    skipped : int
+        Lookups in AND/OR operands that were never evaluated because the outcome was decided.
+    """
+    def __init__(self) -> None:
+        self.performed: int = 0
+        self.skipped: int = 0
+
+    def reset(self) -> None:
+        self.performed = 0
+        self.skipped = 0
+
+    def __repr__(self) -> str:
+        return f"LookupCounter(performed={self.performed}, skipped={self.skipped})"
+
+def _evaluate_node(
+    node: list, record: Mapping, counter: Union[LookupCounter, None], resolve, field_types: Mapping[str, str],
+) -> bool:
+    if is_comparison(node):
+        lhs, symbol, expected = node
+        if not isinstance(lhs, myField):
+            return COMPARISON_OPERATORS[symbol](lhs, expected)
+        if counter is not None:
+            counter.performed += 1
+        if field_types:
+            kind, target = typed_comparison(lhs, expected, field_types)
+            if kind is not None:
+                return COMPARISON_OPERATORS[symbol](CONVERTERS[kind](record[resolve(lhs)]), target)
+        return COMPARISON_OPERATORS[symbol](str(record[resolve(lhs)]), expected)
+
+    if is_constant(node):
+        return node[0]
+
+    if is_negation(node):
+        return not _evaluate_node(node[1], record, counter, resolve, field_types)
+
+    operator, operands = split_chain(node)
+    # AND is decided by the first False operand, OR by the first True one
+    decided = operator == 'OR'
+    for index, operand in enumerate(operands):
+        if _evaluate_node(operand, record, counter, resolve, field_types) == decided:
+            if counter is not None:
+                counter.skipped += sum(count_lookups(rest) for rest in operands[index + 1:])
+            return decided
+    return not decided
+
+def evaluate_ast(
+    ast: list,
+    record: Mapping,
+    counter: Union[LookupCounter, None] = None,
+    columns: Union[ColumnTable, None] = None,
+    field_types: Union[Mapping[str, str], None] = None,
+) -> bool:
+    """
+    Evaluate a list-based AST against a record in a single left-to-right walk.
+
+    Unlike substitute() followed by evaluate(), fields are looked up only when they are
+    reached, and the remaining operands of an AND or OR are skipped as soon as the outcome
+    is decided. Negations are honoured.
+
+    Args:
+        ast (list): An AST as returned by BranchingLogicParser.create_ast().
+        record (Mapping): The record, mapping field name to value.
+        counter (LookupCounter, optional): Accumulates the lookups performed and skipped.
+        columns (ColumnTable, optional): Look fields up by column position, for a record held
+            as a row of an export.
+        field_types (Mapping[str, str], optional): The comparison type of numeric and date
+            fields (see compiler.compile_ast), compared as converted values instead of strings.
+    Returns:
+        bool: The result of the branching logic for this record.
+    """
+    resolve = lookup_key if columns is None else columns.key
+    return _evaluate_node(root(ast), record, counter, resolve, field_types or {})
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+"""
+Resolution of [event][field] references against longitudinal exports, which hold one row per
+record and event. Such references look a field up in the row of the same record for another
+event; their lookup key (see logic_ast.lookup_key) is the tuple (event, field).
+"""
+
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+from typing import Dict, Hashable, Iterator, Tuple, Union
+
+EVENT_COLUMN = "redcap_event_name"
+REPEAT_INSTRUMENT_COLUMN = "redcap_repeat_instrument"
+
+# The value of a field in an event the record has no row for, as REDCap reads it
+MISSING = ""
+
+class EventIndex:
+    """
+    This class indexes the rows of a longitudinal export by (record, event), so that a
+    cross-event reference resolves with a dictionary lookup for a single record, or with one
+    gather per event for a whole DataFrame.
+
+    If data_df has no event column (a classic project), events are ignored and [event][field]
+    resolves to the field in the same row.
+
+    Rows of repeating instruments (a non-blank redcap_repeat_instrument) share their record and
+    event with the event's own row, which is the one [event][field] and record() resolve to.
+    Any other rows sharing a record and event raise ValueError when they are resolved.
+
+    data_df : pd.DataFrame
+        One row per record and event, one REDCap field per column.
+    record_id : Union[str, None]
+        The record ID column. Defaults to the index if it is named, otherwise the first column,
+        as in REDCap exports. With a (record_id, redcap_event_name) MultiIndex, as PyCap's
+        longitudinal DataFrame exports have, the record ID and event are read from the index.
+    event_column : str
+        The event name column, or index level.
+    """
+    def __init__(
+        self,
+        data_df: pd.DataFrame,
+        record_id: Union[str, None] = None,
+        event_column: str = EVENT_COLUMN,
+    ) -> None:
+        self.data_df: pd.DataFrame = data_df
+        index = data_df.index
+        if record_id is not None:
+            ids = data_df[record_id]
+        elif isinstance(index, pd.MultiIndex):
+            level = next(level for level, name in enumerate(index.names) if name != event_column)
+            ids = index.get_level_values(level)
+        elif index.name is not None:
+            ids = index
+        else:
+            ids = data_df.iloc[:, 0]
+        self.record_ids: np.ndarray = ids.to_numpy()
+        self.events: Union[np.ndarray, None] = None
+        if event_column in data_df.columns:
+            self.events = data_df[event_column].to_numpy()
+        elif event_column in index.names:
+            self.events = index.get_level_values(event_column).to_numpy()
+        # The rows references resolve to: all but those of repeating instruments
+        self.__base_rows: np.ndarray = np.ones(len(data_df), dtype=bool)
+        if REPEAT_INSTRUMENT_COLUMN in data_df.columns:
+            instruments = data_df[REPEAT_INSTRUMENT_COLUMN]
+            self.__base_rows = (instruments.isna() | (instruments.astype(str) == MISSING)).to_numpy()
+        # Row position -> record number, and record number -> row position for each event
+        self.__record_codes, self.__records = pd.factorize(self.record_ids)
+        self.__event_rows: Dict[Hashable, np.ndarray] = {}
+        self.__positions: Union[Dict[Tuple[Hashable, Hashable], int], None] = None
+        # Column values as lists, by name or position, for single-cell lookups
+        self.__cells: Dict[Union[str, int], list] = {}
+        self.__record_list: list = self.record_ids.tolist()
+
+    @property
+    def longitudinal(self) -> bool:
+        return self.events is not None
+
+    def __rows_for_event(self, event: str) -> np.ndarray:
+        """
+        The row position of every record's row for an event, or -1 where it has none.
+        """
+        try:
+            return self.__event_rows[event]
+        except KeyError:
+            pass
+        rows = np.full(len(self.__records), -1, dtype=np.int64)
+        positions = np.flatnonzero((self.events == event) & self.__base_rows)
+        codes = self.__record_codes[positions]
+        unique, counts = np.unique(codes, return_counts=True)
+        if len(unique) < len(codes):
+            raise self.__duplicate(self.__records[unique[counts > 1][0]], event)
+        rows[codes] = positions
+        self.__event_rows[event] = rows
+        return rows
+
+    def position(self, record_id: Hashable, event: Union[str, None]) -> Union[int, None]:
+        """
+        The row position of a record's row for an event, or None if it has none.
+        """
+        if self.__positions is None:
+            events = self.events.tolist() if self.events is not None else [None] * len(self.record_ids)
+            positions: Dict[Tuple[Hashable, Hashable], int] = {}
+            for position in np.flatnonzero(self.__base_rows).tolist():
+                key = (self.__record_list[position], events[position])
+                if key in positions:
+                    raise self.__duplicate(*key)
+                positions[key] = position
+            self.__positions = positions
+        return self.__positions.get((record_id, event))
+
+    @staticmethod
+    def __duplicate(record_id: Hashable, event: Union[str, None]) -> ValueError:
+        return ValueError(
+            f"Several rows for record {record_id!r} and event {event!r}; references need one row per "
+            "record and event besides those of repeating instruments"
+        )
+
+    def cell(self, position: int, field: Union[str, int]):
+        """
+        The value of a field (by name or column position) in the row at a position.
+        """
+        try:
+            values = self.__cells[field]
+        except KeyError:
+            column = self.data_df.iloc[:, field] if isinstance(field, int) else self.data_df[field]
+            values = self.__cells[field] = column.to_numpy(dtype=object).tolist()
+        return values[position]
+
+    def record_id(self, position: int) -> Hashable:
+        """
+        The record ID of the row at a position.
+        """
+        return self.__record_list[position]
+
+    def column(self, event: str, field: str) -> pd.Series:
+        """
+        The values of [event][field] for every row: the field's value in the row of the same
+        record for the event, or a blank if the record has no such row.
+        """
+        if not self.longitudinal:
+            return self.data_df[field]
+        rows = self.__rows_for_event(event)[self.__record_codes]
+        # A trailing blank, so rows without an event row (-1) pick it up
+        values = np.append(self.data_df[field].to_numpy(dtype=object), MISSING)
+        return pd.Series(values[rows], index=self.data_df.index, name=field)
+
+    def values(self, key: Union[str, Tuple[str, str]]) -> pd.Series:
+        """
+        The column a lookup key reads, resolving (event, field) keys across event rows.
+        """
+        if isinstance(key, tuple):
+            return self.column(*key)
+        return self.data_df[key]
+
+    def record(self, record_id: Hashable, event: Union[str, None] = None) -> "EventRecord":
+        """
+        A record's row for an event, as a mapping that also resolves (event, field) keys.
+        """
+        position = self.position(record_id, event)
+        if position is None:
+            raise KeyError((record_id, event))
+        return EventRecord(self, position)
+
+    def records(self) -> Iterator[Tuple[Hashable, Union[str, None], "EventRecord"]]:
+        """
+        Yield (record_id, event, record) for every row, in order.
+        """
+        events = self.events if self.events is not None else [None] * len(self.record_ids)
+        for position, (record_id, event) in enumerate(zip(self.record_ids, events)):
+            yield record_id, event, EventRecord(self, position)
+
+class EventRecord(Mapping):
+    """
+    This class is a read-only view of one row of an EventIndex. Field names read the row itself
+    and (event, field) keys read the same record's row for that event, so it can be passed to
+    compiled rules, evaluate_ast(), and execute() in place of a plain dictionary. Column
+    positions (see columns.ColumnTable) may be used in place of field names.
+    """
+    __slots__ = ("index", "position")
+
+    def __init__(self, index: EventIndex, position: int) -> None:
+        self.index: EventIndex = index
+        self.position: int = position
+
+    def __getitem__(self, key):
+        index = self.index
+        if not isinstance(key, tuple):
+            return index.cell(self.position, key)
+        event, field = key
+        if not index.longitudinal:
+            return index.cell(self.position, field)
+        position = index.position(index.record_id(self.position), event)
+        if position is None:
+            if not isinstance(field, int) and field not in index.data_df.columns:
+                raise KeyError(key)
+            return MISSING
+        return index.cell(position, field)
+
+    def __iter__(self):
+        return iter(self.index.data_df.columns)
+
+    def __len__(self) -> int:
+        return len(self.index.data_df.columns)
+
+    def __repr__(self) -> str:
+        return f"EventRecord(position={self.position})"
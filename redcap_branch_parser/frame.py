@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Mapping, Tuple, Union
+from .myfield import myField
+from .coercion import CONVERTERS, typed_comparison
+from .encoding import encode_values
+from .events import EventIndex
+from .logic_ast import COMPARISON_OPERATORS, LookupKey, root, is_constant, is_comparison, is_negation, split_chain, lookup_key
+
+class FrameEvaluator:
+    """
+    This class evaluates list-based ASTs against every record (row) of one DataFrame.
+
+    Columns are factorised the first time a rule compares them and reused by every later
+    rule evaluated on the same instance, so a whole rule set costs one pass per column.
+
+    data_df : pd.DataFrame
+        One record per row, one REDCap field per column.
+    field_types : Union[Mapping[str, str], None]
+        The comparison type of numeric and date fields (see compiler.compile_ast). Their
+        columns are converted once per evaluator and compared as floats.
+    events : Union[EventIndex, None]
+        Resolves [event][field] references of longitudinal DataFrames by joining each row to
+        the same record's row for the event. Built from data_df on first use if omitted.
+    """
+    def __init__(
+        self,
+        data_df: pd.DataFrame,
+        field_types: Union[Mapping[str, str], None] = None,
+        events: Union[EventIndex, None] = None,
+    ) -> None:
+        self.data_df: pd.DataFrame = data_df
+        self.events: Union[EventIndex, None] = events
+        self.field_types: Mapping[str, str] = field_types or {}
+        # Lookup key -> (codes, stringified unique values)
+        self.__columns: Dict[LookupKey, Tuple[np.ndarray, list]] = {}
+        # (lookup key, comparison type) -> converted column
+        self.__typed_columns: Dict[Tuple[LookupKey, str], np.ndarray] = {}
+
+    def __values(self, key: LookupKey) -> pd.Series:
+        if isinstance(key, tuple):
+            if self.events is None:
+                self.events = EventIndex(self.data_df)
+            return self.events.values(key)
+        return self.data_df[key]
+
+    def __factorize_column(self, key: LookupKey) -> Tuple[np.ndarray, list]:
+        """
+        Factorise a column by stringified value, so each comparison only has to compare the
+        column's distinct values, not every cell.
+        """
+        try:
+            return self.__columns[key]
+        except KeyError:
+            pass
+        factorized = encode_values(self.__values(key))
+        self.__columns[key] = factorized
+        return factorized
+
+    def __typed_column(self, key: LookupKey, kind: str) -> np.ndarray:
+        """
+        Convert a column to floats, converting each distinct value once.
+        """
+        try:
+            return self.__typed_columns[(key, kind)]
+        except KeyError:
+            pass
+        codes, uniques = self.__factorize_column(key)
+        convert = CONVERTERS[kind]
+        converted = np.fromiter((convert(value) for value in uniques), dtype=np.float64, count=len(uniques))[codes]
+        self.__typed_columns[(key, kind)] = converted
+        return converted
+
+    def __evaluate_comparison(self, node: list) -> np.ndarray:
+        lhs, symbol, expected = node
+        compare = COMPARISON_OPERATORS[symbol]
+
+        if not isinstance(lhs, myField):
+            return np.full(len(self.data_df), compare(lhs, expected), dtype=bool)
+
+        key = lookup_key(lhs)
+        kind, target = typed_comparison(lhs, expected, self.field_types)
+        if kind is not None:
+            return compare(self.__typed_column(key, kind), target)
+
+        codes, uniques = self.__factorize_column(key)
+
+        # Equality is a single integer comparison against the code of the expected value
+        if symbol in ('=', "<>"):
+            try:
+                position = uniques.index(expected)
+            except ValueError:
+                return np.full(len(codes), symbol == "<>", dtype=bool)
+            return codes == position if symbol == '=' else codes != position
+
+        matches = np.fromiter((compare(value, expected) for value in uniques), dtype=bool, count=len(uniques))
+        return matches[codes]
+
+    def evaluate_node(self, node: list) -> np.ndarray:
+        """
+        Evaluate a single AST node, returning one boolean per row.
+        """
+        if is_comparison(node):
+            return self.__evaluate_comparison(node)
+        if is_constant(node):
+            return np.full(len(self.data_df), node[0], dtype=bool)
+        if is_negation(node):
+            return ~self.evaluate_node(node[1])
+
+        operator, operands = split_chain(node)
+        combine = np.logical_and if operator == 'AND' else np.logical_or
+        result = self.evaluate_node(operands[0])
+        for operand in operands[1:]:
+            result = combine(result, self.evaluate_node(operand))
+        return result
+
+    def evaluate(self, ast: list) -> pd.Series:
+        """
+        Evaluate an AST as returned by create_ast(), returning a boolean Series sharing the
+        DataFrame's index.
+        """
+        return pd.Series(self.evaluate_node(root(ast)), index=self.data_df.index, dtype=bool)
+
+def evaluate_frame(ast: list, data_df: pd.DataFrame, field_types: Union[Mapping[str, str], None] = None) -> pd.Series:
+    """
+    Evaluate a list-based AST against every record (row) of a DataFrame at once.
+
+    Each comparison becomes a column-wise operation and the results are combined with
+    NumPy's element-wise AND, OR, and NOT, so no Python code runs per record. Cell values are
+    compared as strings exactly like the record-at-a-time evaluators do.
+
+    Args:
+        ast (list): An AST as returned by BranchingLogicParser.create_ast().
+        data_df (pd.DataFrame): One record per row, one REDCap field per column.
+        field_types (Mapping[str, str], optional): Comparison types of numeric and date fields.
+    Returns:
+        pd.Series: Boolean result per record, sharing the DataFrame's index.
+    """
+    return FrameEvaluator(data_df, field_types=field_types).evaluate(ast)
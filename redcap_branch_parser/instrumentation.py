@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+from collections.abc import Mapping
+from typing import Callable, Dict, NamedTuple
+from .logic_ast import count_nodes
+
+# The parser methods that are timed, by their public name
+PHASES = ("create_ast", "substitute", "evaluate", "compile", "assemble", "evaluate_frame", "to_sql", "specialize", "simplify", "parse")
+# Calls of the rules returned by compile()
+RULE_PHASE = "rule"
+
+class PhaseStats(NamedTuple):
+    """
+    The number of calls of a phase and their total wall time, in seconds.
+    """
+    calls: int
+    seconds: float
+
+class StatsSnapshot(NamedTuple):
+    """
+    Snapshot of a parser's instrumentation.
+
+    phases : Dict[str, PhaseStats]
+        Calls and wall time per phase. Times include nested phases, e.g. parse() includes the
+        compile() and create_ast() calls it makes.
+    cache_hits : int
+        create_ast() calls answered by the in-memory parse cache.
+    cache_misses : int
+        create_ast() calls that had to load or parse the string.
+    disk_cache_hits : int
+        Misses loaded from the on-disk cache instead of being parsed.
+    lookups : int
+        Record lookups made by substitute(), parse(), and compiled rules.
+    ast_nodes : int
+        Nodes (comparisons, negations, and chains) of the ASTs returned by create_ast().
+    """
+    phases: Dict[str, PhaseStats]
+    cache_hits: int
+    cache_misses: int
+    disk_cache_hits: int
+    lookups: int
+    ast_nodes: int
+
+class CountingRecord(Mapping):
+    """
+    This class wraps a record and counts the lookups made through it.
+    """
+    __slots__ = ("record", "lookups")
+
+    def __init__(self, record: Mapping) -> None:
+        self.record = record
+        self.lookups: int = 0
+
+    def __getitem__(self, key):
+        self.lookups += 1
+        return self.record[key]
+
+    def __iter__(self):
+        return iter(self.record)
+
+    def __len__(self) -> int:
+        return len(self.record)
+
+class ParserInstrumentation:
+    """
+    This class records per-phase wall time and call counts, cache hits, lookups, and AST
+    sizes for a BranchingLogicParser created with instrument=True.
+
+    It works by replacing the parser's public methods with timed wrappers, so parsers without
+    instrumentation run exactly the code they would otherwise. The counters are thread-safe.
+    """
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Zero every counter.
+        """
+        with self.__lock:
+            self.__calls: Dict[str, int] = {}
+            self.__seconds: Dict[str, float] = {}
+            self.__counters: Dict[str, int] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self.__lock:
+            self.__calls[phase] = self.__calls.get(phase, 0) + 1
+            self.__seconds[phase] = self.__seconds.get(phase, 0.0) + seconds
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        with self.__lock:
+            self.__counters[counter] = self.__counters.get(counter, 0) + amount
+
+    def snapshot(self) -> StatsSnapshot:
+        """
+        The counters as they are now.
+        """
+        with self.__lock:
+            phases = {phase: PhaseStats(calls, self.__seconds[phase]) for phase, calls in self.__calls.items()}
+            counters = dict(self.__counters)
+        misses = counters.get("cache_misses", 0)
+        return StatsSnapshot(
+            phases=phases,
+            cache_hits=phases.get("create_ast", PhaseStats(0, 0.0)).calls - misses,
+            cache_misses=misses,
+            disk_cache_hits=counters.get("disk_cache_hits", 0),
+            lookups=counters.get("lookups", 0),
+            ast_nodes=counters.get("ast_nodes", 0),
+        )
+
+    def __timed(self, phase: str, function: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add(phase, time.perf_counter() - start)
+        return timed
+
+    def __run(self, phase: str, call: Callable[[Mapping], object], record: Mapping):
+        """
+        Time a call on a record, counting the lookups it makes.
+        """
+        counting = CountingRecord(record)
+        start = time.perf_counter()
+        try:
+            return call(counting)
+        finally:
+            self.add(phase, time.perf_counter() - start)
+            self.count("lookups", counting.lookups)
+
+    def install(self, parser) -> None:
+        """
+        Replace the parser's public methods with instrumented wrappers.
+        """
+        for phase in PHASES:
+            if phase == "create_ast":
+                create_ast = parser.create_ast
+                def counted_create_ast(input_string: str):
+                    ast = create_ast(input_string)
+                    self.count("ast_nodes", count_nodes(ast))
+                    return ast
+                wrapped = self.__timed(phase, counted_create_ast)
+            elif phase == "substitute":
+                substitute = parser.substitute
+                wrapped = lambda ast, record: self.__run("substitute", lambda counting: substitute(ast, counting), record)
+            elif phase == "compile":
+                wrapped = self.__timed(phase, self.__instrument_rules(parser.compile))
+            else:
+                wrapped = self.__timed(phase, getattr(parser, phase))
+            setattr(parser, phase, wrapped)
+
+    def __instrument_rules(self, compile_rule: Callable) -> Callable:
+        def compile_instrumented(input_string: str):
+            rule = compile_rule(input_string)
+            return lambda record: self.__run(RULE_PHASE, rule, record)
+        return compile_instrumented
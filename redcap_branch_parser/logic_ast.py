@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""
+Helpers for walking the list-based AST produced by BranchingLogicParser.create_ast().
+
+The AST is made of three kinds of node:
+    comparison  [lhs, operator, value]      lhs is a myField (or a quoted value), value is a str
+    negation    ['!', node]
+    chain       [node, 'AND', node, ...]    every operator in one chain is the same
+
+Parsing never yields it, but ASTs rewritten by specialize() may also contain:
+    constant    [True] or [False]
+"""
+
+import functools
+import operator as op
+import re
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+from .myfield import myField
+
+COMPARISON_OPERATORS: Dict[str, Callable[[str, str], bool]] = {
+    '=' : op.eq,
+    "<>": op.ne,
+    '<' : op.lt,
+    ">" : op.gt,
+    '<=': op.le,
+    '>=': op.ge
+}
+BOOLEAN_OPERATORS: Tuple[str, str] = ('AND', 'OR')
+NOT: str = '!'
+
+# A field name, or (event, field) for [event][field] references
+LookupKey = Union[str, Tuple[str, str]]
+
+def root(ast: list) -> list:
+    """
+    Unwrap the single-element list that create_ast() returns around the top-level node.
+    """
+    if len(ast) == 1 and isinstance(ast[0], list):
+        return ast[0]
+    return ast
+
+def is_constant(node: list) -> bool:
+    return len(node) == 1 and isinstance(node[0], bool)
+
+def is_comparison(node: list) -> bool:
+    return len(node) == 3 and not isinstance(node[0], list) and node[1] in COMPARISON_OPERATORS
+
+def is_negation(node: list) -> bool:
+    return len(node) == 2 and node[0] == NOT
+
+def split_chain(node: list) -> Tuple[str, List[list]]:
+    """
+    Split an AND/OR chain into its boolean operator and its operands.
+
+    The pyparsing grammar also chains comparisons with a comparison operator, as in
+    "[a]='1' <> [b]='1'". Those chains have no meaning in REDCap and are rejected here, so
+    that every evaluator rejects them alike.
+
+    Raises:
+        ValueError: If the chain's operator is not AND or OR.
+    """
+    operator = node[1]
+    if operator not in BOOLEAN_OPERATORS:
+        raise ValueError(f"Expected AND or OR between expressions, found {operator!r}")
+    return operator, node[0::2]
+
+def join_chain(operator: str, operands: List[list]) -> list:
+    """
+    Join operands into an AND/OR chain, the inverse of split_chain().
+    """
+    chain = [operands[0]]
+    for operand in operands[1:]:
+        chain += [operator, operand]
+    return chain
+
+def lookup_key(field: myField) -> LookupKey:
+    """
+    The key used to look a field's value up in a record: the exported column name (field___code
+    for checkbox choices), or (event, column) for references to another event (see
+    events.EventIndex).
+    """
+    column = field.field if field.check is None else checkbox_column(field.field, field.check)
+    if field.event is not None:
+        return (field.event, column)
+    return column
+
+def count_lookups(node: list) -> int:
+    """
+    The number of record lookups evaluating the node in full would perform.
+    """
+    if is_comparison(node):
+        return 1 if isinstance(node[0], myField) else 0
+    if is_constant(node):
+        return 0
+    if is_negation(node):
+        return count_lookups(node[1])
+    return sum(count_lookups(operand) for operand in split_chain(node)[1])
+
+def count_nodes(ast: list) -> int:
+    """
+    The number of comparisons, negations, and chains in an AST.
+    """
+    node = root(ast)
+    if is_comparison(node) or is_constant(node):
+        return 1
+    if is_negation(node):
+        return 1 + count_nodes(node[1])
+    return 1 + sum(count_nodes(operand) for operand in split_chain(node)[1])
+
+def iter_fields(node: list) -> Iterator[myField]:
+    """
+    Yield every myField the node refers to, left to right.
+    """
+    if is_comparison(node):
+        if isinstance(node[0], myField):
+            yield node[0]
+    elif is_constant(node):
+        return
+    elif is_negation(node):
+        yield from iter_fields(node[1])
+    else:
+        for operand in split_chain(node)[1]:
+            yield from iter_fields(operand)
+
+@functools.lru_cache(maxsize=4096)
+def checkbox_column(field: str, code: str) -> str:
+    """
+    The name of the column REDCap exports for one choice of a checkbox field, e.g. "meds___2".
+    Choice codes are lower-cased and anything but letters, digits, and underscores becomes "_".
+    """
+    return f"{field}___{re.sub(r'[^0-9a-z_]', '_', code.lower())}"
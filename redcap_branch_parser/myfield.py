@@ -1,9 +1,14 @@
-from typing import Union
+from typing import Dict, Tuple, Union
+import threading
 
 class myField:
     """
     This class represents a REDCap field (i.e. variable).
 
+    Instances are immutable and hashable, comparing equal when field, event, and check are
+    equal, so they can be used as dictionary keys. Parsers intern them through a FieldTable,
+    so every occurrence of the same reference in a project's ASTs is the same object.
+
     field : str
         The name or label of the field in REDCap
     event : Optional[Union[str, None]]
@@ -11,11 +16,34 @@ class myField:
     check : Optional[Union[str, None]]
         Specifies if the field refers to a value within a checkbox
     """
+    __slots__ = ("field", "event", "check", "__hash")
+
     def __init__(self, field: str, event: Union[str, None] = None, check: Union[str, None] = None) -> None:
-        self.field: str = field
-        self.event: Union[str, None] = event
-        self.check: Union[str, None] = check
-    
+        object.__setattr__(self, "field", field)
+        object.__setattr__(self, "event", event)
+        object.__setattr__(self, "check", check)
+        object.__setattr__(self, "_myField__hash", hash((field, event, check)))
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"myField is immutable, cannot set '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"myField is immutable, cannot delete '{name}'")
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, myField):
+            return NotImplemented
+        return (self.field, self.event, self.check) == (other.field, other.event, other.check)
+
+    def __hash__(self) -> int:
+        return self.__hash
+
+    def __reduce__(self):
+        # Unpickled fields are interned again, in the default table
+        return (intern_field, (self.field, self.event, self.check))
+
     def __str__(self) -> str:
         if self.event:
             event_string: str = f"[{self.event}]"
@@ -29,4 +57,43 @@ class myField:
         return f"{event_string}{field_string}"
 
     def __repr__ (self) -> str:
-        return f"myField({self.field}, event={self.event}, check={self.check})"
\ No newline at end of file
+        return f"myField({self.field}, event={self.event}, check={self.check})"
+
+class FieldTable:
+    """
+    This class interns myField objects, so that each distinct (field, event, check) reference
+    in a project is represented by a single shared instance.
+
+    Use one table per REDCap project; parsers use default_field_table unless given their own.
+    """
+    def __init__(self) -> None:
+        self.__fields: Dict[Tuple[str, Union[str, None], Union[str, None]], myField] = {}
+        self.__lock = threading.Lock()
+
+    def intern(self, field: str, event: Union[str, None] = None, check: Union[str, None] = None) -> myField:
+        """
+        Return the table's myField for this reference, creating it on first use.
+        """
+        key = (field, event, check)
+        try:
+            return self.__fields[key]
+        except KeyError:
+            with self.__lock:
+                return self.__fields.setdefault(key, myField(field, event, check))
+
+    def __len__(self) -> int:
+        return len(self.__fields)
+
+    def __iter__(self):
+        return iter(list(self.__fields.values()))
+
+    def __contains__(self, field: myField) -> bool:
+        return (field.field, field.event, field.check) in self.__fields
+
+default_field_table = FieldTable()
+
+def intern_field(field: str, event: Union[str, None] = None, check: Union[str, None] = None) -> myField:
+    """
+    Intern a field reference in the default table.
+    """
+    return default_field_table.intern(field, event, check)
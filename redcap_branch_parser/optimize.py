@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+import pandas as pd
+from typing import Callable, Dict, Hashable, List, Mapping, Tuple, Union
+from .events import EventIndex
+from .frame import FrameEvaluator
+from .logic_ast import COMPARISON_OPERATORS, NOT, root, is_constant, is_comparison, is_negation, split_chain, join_chain
+from .myfield import myField
+
+# The probability that a comparison holds for a record, by operator, when no sample is given:
+# equality usually singles out one choice of several, and inequality usually holds
+_DEFAULT_PROBABILITY: Dict[str, float] = {'=': 0.25, "<>": 0.75}
+
+Selectivity = Callable[[list], float]
+
+def heuristic_selectivity(node: list) -> float:
+    """
+    Guess the probability that a comparison holds from its operator alone.
+    """
+    return _DEFAULT_PROBABILITY.get(node[1], 0.5)
+
+def estimate_selectivity(
+    sample_df: pd.DataFrame,
+    field_types: Union[Mapping[str, str], None] = None,
+    events: Union[EventIndex, None] = None,
+) -> Selectivity:
+    """
+    Measure the probability that each comparison holds on a sample of records, for
+    simplify() to order operands by. Comparisons are evaluated once and remembered; those on
+    columns the sample lacks fall back to heuristic_selectivity.
+    """
+    evaluator = FrameEvaluator(sample_df, field_types=field_types, events=events)
+    measured: Dict[tuple, float] = {}
+
+    def selectivity(node: list) -> float:
+        key = tuple(node)
+        if key not in measured:
+            try:
+                measured[key] = float(evaluator.evaluate_node(node).mean()) if len(sample_df) else heuristic_selectivity(node)
+            except KeyError:
+                measured[key] = heuristic_selectivity(node)
+        return measured[key]
+    return selectivity
+
+class _Simplifier:
+    def __init__(self, selectivity: Selectivity, reorder: bool) -> None:
+        self.selectivity = selectivity
+        self.reorder = reorder
+        # Structural key, and (expected lookups, probability of holding), of each simplified node
+        self.keys: Dict[int, Hashable] = {}
+        self.estimates: Dict[int, Tuple[float, float]] = {}
+
+    def finish(self, node: list, key: Hashable, cost: float, probability: float) -> list:
+        self.keys[id(node)] = key
+        self.estimates[id(node)] = (cost, probability)
+        return node
+
+    def constant(self, value: bool) -> list:
+        return self.finish([value], ("const", value), 0.0, 1.0 if value else 0.0)
+
+    def comparison(self, node: list) -> list:
+        lhs, symbol, expected = node
+        if not isinstance(lhs, myField):
+            return self.constant(COMPARISON_OPERATORS[symbol](lhs, expected))
+        node = list(node)
+        return self.finish(node, ("cmp", *node), 1.0, self.selectivity(node))
+
+    def negation(self, node: list) -> list:
+        operand = self.node(node[1])
+        if is_constant(operand):
+            return self.constant(not operand[0])
+        # !!x is x
+        if is_negation(operand):
+            return operand[1]
+        cost, probability = self.estimates[id(operand)]
+        return self.finish([NOT, operand], (NOT, self.keys[id(operand)]), cost, 1.0 - probability)
+
+    def chain(self, node: list) -> list:
+        operator, operands = split_chain(node)
+        # AND is decided by a False operand and unaffected by a True one; OR the other way round
+        decided = operator == 'OR'
+
+        flattened: List[list] = []
+        for operand in operands:
+            operand = self.node(operand)
+            if not (is_constant(operand) or is_comparison(operand) or is_negation(operand)) and operand[1] == operator:
+                flattened.extend(split_chain(operand)[1])
+            else:
+                flattened.append(operand)
+
+        residual: Dict[Hashable, list] = {}
+        for operand in flattened:
+            if is_constant(operand):
+                if operand[0] == decided:
+                    return self.constant(decided)
+                continue
+            # Duplicates are dropped, keeping the first
+            residual.setdefault(self.keys[id(operand)], operand)
+
+        # x AND !x is False, x OR !x is True
+        for key in residual:
+            if (NOT, key) in residual:
+                return self.constant(decided)
+
+        # Absorption: x AND (x OR y) is x, x OR (x AND y) is x
+        kept = []
+        for key, operand in residual.items():
+            if not (is_comparison(operand) or is_negation(operand)):
+                inner = split_chain(operand)[1]
+                if any(self.keys[id(term)] in residual and self.keys[id(term)] != key for term in inner):
+                    continue
+            kept.append(operand)
+
+        if not kept:
+            return self.constant(not decided)
+        if len(kept) == 1:
+            return kept[0]
+        if self.reorder:
+            kept.sort(key=lambda operand: self.rank(operand, decided))
+        return self.estimate(operator, kept)
+
+    def rank(self, operand: list, decided: bool) -> float:
+        """
+        Evaluate first the operands that are cheap and likely to decide the chain.
+        """
+        cost, probability = self.estimates[id(operand)]
+        deciding = probability if decided else 1.0 - probability
+        return cost / deciding if deciding > 0 else float("inf")
+
+    def estimate(self, operator: str, operands: List[list]) -> list:
+        decided = operator == 'OR'
+        cost, reached = 0.0, 1.0
+        for operand in operands:
+            operand_cost, probability = self.estimates[id(operand)]
+            cost += reached * operand_cost
+            # The next operand is only reached if this one did not decide the chain
+            reached *= (1.0 - probability) if decided else probability
+        probability = 1.0 - reached if decided else reached
+        key = (operator, tuple(self.keys[id(operand)] for operand in operands))
+        return self.finish(join_chain(operator, operands), key, cost, probability)
+
+    def node(self, node: list) -> list:
+        if is_comparison(node):
+            return self.comparison(node)
+        if is_constant(node):
+            return self.constant(node[0])
+        if is_negation(node):
+            return self.negation(node)
+        return self.chain(node)
+
+def simplify(ast: list, selectivity: Union[Selectivity, None] = None, reorder: bool = True) -> list:
+    """
+    Rewrite an AST into an equivalent one that is cheaper to evaluate.
+
+    Nested AND/OR chains of the same operator (as parentheses produce) are flattened, double
+    negations and comparisons between two quoted values are removed, constants are folded,
+    duplicate operands are dropped, x AND !x becomes False (x OR !x True), and absorption
+    drops operands made redundant by another (x AND (x OR y) is x, x OR (x AND y) is x).
+
+    Then, unless reorder is False, the operands of every chain are ordered so that those
+    cheapest to evaluate and most likely to decide the chain come first, which reduces the
+    lookups made by the short-circuiting evaluators. The result is the same for any record,
+    but records missing a field may now have it looked up (and raise KeyError) where the
+    original order skipped it.
+
+    Args:
+        ast (list): An AST as returned by BranchingLogicParser.create_ast().
+        selectivity (Callable[[list], float], optional): The probability that a comparison
+            holds, e.g. estimate_selectivity(sample_df). Defaults to heuristic_selectivity.
+        reorder (bool): Whether to reorder operands.
+    Returns:
+        list: The simplified AST, in the same form as create_ast() returns. The AST given is
+        not modified.
+    Raises:
+        ValueError: If a chain is joined by anything but AND or OR (see logic_ast.split_chain).
+    """
+    simplifier = _Simplifier(selectivity or heuristic_selectivity, reorder)
+    return [simplifier.node(root(ast))]
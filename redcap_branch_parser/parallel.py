@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Mapping, Sequence, Tuple, Union
+from .branching_logic_parser import BranchingLogicParser
+from .bytecode import Program, execute
+
+# The rules of the current worker process, installed once by _initialise_worker()
+_worker_programs: Tuple[Program, ...] = ()
+
+def _initialise_worker(programs: Tuple[Program, ...]) -> None:
+    global _worker_programs
+    _worker_programs = programs
+
+def _evaluate_chunk(records: List[Mapping]) -> List[Tuple[bool, ...]]:
+    programs = _worker_programs
+    return [tuple(execute(program, record) for program in programs) for record in records]
+
+def _chunks(records: Iterable[Mapping], chunksize: int) -> Iterator[List[Mapping]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+def parallel_evaluate(
+    rules: Sequence[Union[str, Program]],
+    records: Iterable[Mapping],
+    workers: Union[int, None] = None,
+    chunksize: int = 1000,
+    parser: Union[BranchingLogicParser, None] = None,
+) -> Iterator[Tuple[bool, ...]]:
+    """
+    Evaluate every rule against every record on a pool of worker processes.
+
+    Rules are assembled into bytecode Programs in this process and sent to each worker
+    once, when it starts, so tasks only carry records. Records are partitioned into chunks,
+    and only a bounded number of chunks are in flight at a time, so records can be a lazy
+    iterable larger than memory.
+
+    Args:
+        rules (Sequence[Union[str, Program]]): Branching logic strings or assembled Programs.
+        records (Iterable[Mapping]): The records, each mapping field name to value. They must be picklable.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        chunksize (int): Number of records sent to a worker per task.
+        parser (BranchingLogicParser, optional): Parser used to assemble string rules.
+    Yields:
+        Tuple[bool, ...]: One result per rule, for each record in the order given.
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be positive, got {chunksize}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if parser is None:
+        parser = BranchingLogicParser()
+    programs = tuple(rule if isinstance(rule, Program) else parser.assemble(rule) for rule in rules)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialise_worker, initargs=(programs,)) as executor:
+        # Keep every worker busy with one chunk queued behind it, without reading ahead further
+        max_in_flight = 2 * workers
+        in_flight: deque = deque()
+        for chunk in _chunks(records, chunksize):
+            in_flight.append(executor.submit(_evaluate_chunk, chunk))
+            if len(in_flight) >= max_in_flight:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, NamedTuple
+
+class CacheInfo(NamedTuple):
+    """
+    Snapshot of a ParseCache's counters.
+    """
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+class ParseCache:
+    """
+    This class implements a bounded, thread-safe least-recently-used (LRU) cache that maps
+    branching logic strings to their parsed, list-based ASTs.
+
+    REDCap data dictionaries reuse the same branching logic string on many fields, so keeping
+    the parsed AST around means every distinct string is only handed to pyparsing once.
+    Cached ASTs are shared between callers and must be treated as read-only.
+
+    maxsize : int
+        The maximum number of entries kept. The least recently used entry is evicted when full.
+        A maxsize of 0 disables caching (every lookup is a miss).
+    """
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 0:
+            raise ValueError(f"maxsize must be non-negative, got {maxsize}")
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_or_parse(self, key: Hashable, parse: Callable[[], list]) -> list:
+        """
+        Return the cached AST for key, calling parse() and storing its result on a miss.
+
+        The parse itself runs outside the lock, so two threads missing on the same key at the
+        same time may both parse it; the result is identical either way.
+        """
+        with self.__lock:
+            try:
+                ast = self.__entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return ast
+
+        ast = parse()
+
+        if self.maxsize:
+            with self.__lock:
+                self.__entries[key] = ast
+                self.__entries.move_to_end(key)
+                self.__evict()
+        return ast
+
+    def resize(self, maxsize: int) -> None:
+        """
+        Change the maximum number of entries, evicting the least recently used ones if needed.
+        """
+        if maxsize < 0:
+            raise ValueError(f"maxsize must be non-negative, got {maxsize}")
+        with self.__lock:
+            self.maxsize = maxsize
+            self.__evict()
+
+    def clear(self) -> None:
+        """
+        Drop every entry and reset the counters.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Return a snapshot of the hit, miss, and eviction counters.
+        """
+        with self.__lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.__entries))
+
+    def __evict(self) -> None:
+        # Caller must hold the lock
+        while len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+# Process-wide cache shared by every BranchingLogicParser that does not supply its own
+default_parse_cache = ParseCache()
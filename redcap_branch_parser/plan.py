@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import pyparsing as pp
+from typing import Dict, List, Mapping, Union
+from .branching_logic_parser import BranchingLogicParser
+from .cse import SharedExpressions, SharingInfo
+from .data_dictionary import field_names, field_types
+from .events import EventIndex
+from .frame import FrameEvaluator
+from .logic_ast import LookupKey, root, iter_fields, lookup_key
+from .pratt import BranchingLogicSyntaxError
+from .specialize import specialize
+from .optimize import estimate_selectivity, simplify
+
+def _branching_logic(value) -> Union[str, None]:
+    """
+    Normalise a data dictionary branching_logic cell: blank and missing cells mean no logic.
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    return value or None
+
+class VisibilityPlan:
+    """
+    This class holds the branching logic of a whole data dictionary, parsed once and deduplicated.
+
+    fields : List[str]
+        Every field in the data dictionary, in data dictionary order.
+    field_logic : Dict[str, Union[str, None]]
+        The normalised branching logic string of each field, or None if it is always shown.
+    expressions : Dict[str, list]
+        The AST of every distinct branching logic string.
+    field_types : Union[Mapping[str, str], None]
+        The comparison type of numeric and date fields. Their columns are converted once per
+        evaluation and compared as numbers or dates instead of strings.
+    """
+    def __init__(
+        self,
+        fields: List[str],
+        field_logic: Dict[str, Union[str, None]],
+        expressions: Dict[str, list],
+        field_types: Union[Mapping[str, str], None] = None,
+    ) -> None:
+        self.fields: List[str] = fields
+        self.field_logic: Dict[str, Union[str, None]] = field_logic
+        self.expressions: Dict[str, list] = expressions
+        self.field_types: Mapping[str, str] = field_types or {}
+        self.shared: SharedExpressions = SharedExpressions(expressions, self.field_types)
+
+    def referenced_columns(self) -> List[LookupKey]:
+        """
+        The record keys the plan's expressions look up, in first-use order: column names, and
+        (event, field) for references to other events.
+        """
+        columns = {}
+        for ast in self.expressions.values():
+            for field in iter_fields(root(ast)):
+                columns[lookup_key(field)] = None
+        return list(columns)
+
+    def sharing(self) -> SharingInfo:
+        """
+        How many AST nodes the plan's expressions have in total and after deduplication.
+        """
+        return self.shared.info()
+
+    def evaluate(self, data_df: pd.DataFrame, events: Union[EventIndex, None] = None) -> pd.DataFrame:
+        """
+        Compute the records x fields visibility matrix for the given records.
+
+        Every distinct expression is evaluated once over the whole DataFrame, as is every
+        distinct subexpression however many expressions contain it (see SharedExpressions),
+        and every column is factorised at most once however many expressions compare it.
+
+        Args:
+            data_df (pd.DataFrame): One record (or record and event) per row, one REDCap field per column.
+            events (EventIndex, optional): The (record, event) index of a longitudinal data_df,
+                used to resolve [event][field] references. Built on first use if omitted.
+        Returns:
+            pd.DataFrame: Boolean matrix with data_df's index and one column per field.
+        """
+        evaluator = FrameEvaluator(data_df, self.field_types, events)
+        results: Dict[str, np.ndarray] = self.shared.evaluate_frame(evaluator)
+        always_shown = np.ones(len(data_df), dtype=bool)
+
+        matrix = {
+            field: always_shown if logic is None else results[logic]
+            for field, logic in self.field_logic.items()
+        }
+        return pd.DataFrame(matrix, index=data_df.index, columns=self.fields)
+
+    def specialize(self, known_values: Mapping) -> "VisibilityPlan":
+        """
+        A plan for records whose values for some fields are known in advance (see
+        specialize.specialize): every expression is partially evaluated with those values, so
+        evaluating the new plan only looks up the other fields.
+        """
+        expressions = {
+            logic: specialize(ast, known_values, self.field_types) for logic, ast in self.expressions.items()
+        }
+        return VisibilityPlan(self.fields, self.field_logic, expressions, self.field_types)
+
+    def simplify(self, sample_df: Union[pd.DataFrame, None] = None) -> "VisibilityPlan":
+        """
+        A plan whose expressions are simplified and have their operands ordered by cost (see
+        optimize.simplify), which makes per-record evaluation cheaper. Given a sample of
+        records, operands are ordered by how often their comparisons hold on it.
+        """
+        selectivity = None
+        if sample_df is not None:
+            selectivity = estimate_selectivity(sample_df, self.field_types)
+        expressions = {logic: simplify(ast, selectivity) for logic, ast in self.expressions.items()}
+        return VisibilityPlan(self.fields, self.field_logic, expressions, self.field_types)
+
+    def evaluate_record(self, record: Mapping) -> Dict[str, bool]:
+        """
+        Decide the visibility of every field for a single record, a mapping from column name
+        to value. Subexpressions shared between fields are evaluated once.
+        """
+        results = self.shared.evaluate_record(record)
+        return {
+            field: True if logic is None else results[logic]
+            for field, logic in self.field_logic.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __repr__(self) -> str:
+        return f"VisibilityPlan(fields={len(self.fields)}, expressions={len(self.expressions)})"
+
+def compile_data_dictionary(df_datadict: pd.DataFrame, parser: Union[BranchingLogicParser, None] = None) -> VisibilityPlan:
+    """
+    Parse the branching_logic column of a REDCap data dictionary into a VisibilityPlan.
+
+    Each distinct logic string is parsed once, however many fields share it. If the data
+    dictionary has a field_type column, the plan compares numeric and date fields (calc,
+    slider, and text fields validated as integer, number, date, or datetime) by value.
+
+    Args:
+        df_datadict (pd.DataFrame): The exported metadata, with a "branching_logic" column.
+        parser (BranchingLogicParser, optional): The parser to use. A default parser is created if omitted.
+    Returns:
+        VisibilityPlan: The compiled plan.
+    Raises:
+        ValueError: If a field's branching logic cannot be parsed.
+    """
+    if parser is None:
+        parser = BranchingLogicParser()
+
+    fields = field_names(df_datadict)
+    field_logic: Dict[str, Union[str, None]] = {}
+    expressions: Dict[str, list] = {}
+
+    for field, value in zip(fields, df_datadict["branching_logic"]):
+        logic = _branching_logic(value)
+        field_logic[field] = logic
+        if logic is None or logic in expressions:
+            continue
+        try:
+            expressions[logic] = parser.create_ast(logic)
+        except (pp.ParseException, BranchingLogicSyntaxError) as error:
+            raise ValueError(f"Unable to parse branching logic of field '{field}': {logic}") from error
+
+    types = None
+    if "field_type" in df_datadict.columns:
+        types = field_types(df_datadict)
+
+    return VisibilityPlan(fields, field_logic, expressions, types)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+"""
+A dependency-free tokenizer and Pratt parser for REDCap Branching Logic.
+
+It implements the same grammar as the pyparsing grammar in branching_logic_parser and yields
+the same list-based AST, without pyparsing's backtracking: every token is recognised by
+looking at its first character, and each field reference is matched in a single pass.
+"""
+
+import re
+import string
+from typing import Tuple, Union
+from .myfield import myField, FieldTable, default_field_table
+
+# Characters skipped between tokens, and characters that may not touch a keyword (as in pyparsing)
+_WHITESPACE = " \t\n\r"
+_KEYWORD_CHARS = frozenset(string.ascii_letters + string.digits + "_$")
+_WORD_CHARS = frozenset(string.ascii_letters + string.digits + "_")
+
+# Longest operators first, so that "<>" is not read as "<"
+_COMPARISON_OPERATORS: Tuple[str, ...] = ("<>", ">=", "<=", "=", ">", "<")
+
+# Binding power of each infix operator. "!" binds tighter than all of them.
+_OR_POWER, _AND_POWER, _COMPARISON_POWER = 1, 2, 3
+_PREFIX_POWER = 4
+
+# Backslash escapes converted inside quoted strings, as pyparsing's QuotedString does
+_ESCAPES = re.compile(r"\\([tnfr0])")
+_ESCAPED = {"t": "\t", "n": "\n", "f": "\f", "r": "\r", "0": "\0"}
+
+class BranchingLogicSyntaxError(ValueError):
+    """
+    Raised when a string is not valid REDCap Branching Logic.
+
+    loc : int
+        The position in the string at which parsing failed.
+    """
+    def __init__(self, message: str, input_string: str, loc: int) -> None:
+        self.input_string: str = input_string
+        self.loc: int = loc
+        super().__init__(f"{message} (at char {loc})")
+
+class PrattParser:
+    """
+    This class parses a branching logic string into the list-based AST that the pyparsing
+    grammar yields, i.e. the result of `grammar.parse_string(s).as_list()`.
+
+    Grammar, from loosest to tightest binding:
+        or_expr    ::= and_expr ( "OR" and_expr )*
+        and_expr   ::= cmp_expr ( "AND" cmp_expr )*
+        cmp_expr   ::= not_expr ( operator not_expr )*
+        not_expr   ::= "!" not_expr | primary
+        primary    ::= field operator value | "(" or_expr ")"
+
+    Like pyparsing's parse_string(), the longest valid prefix is parsed and any trailing text
+    that cannot continue the expression is ignored.
+
+    field_table : FieldTable
+        The table myField objects are interned in.
+    """
+    def __init__(self, field_table: FieldTable = default_field_table) -> None:
+        self.field_table: FieldTable = field_table
+
+    def parse(self, input_string: str) -> list:
+        """
+        Parse the string, returning its AST.
+
+        Raises:
+            BranchingLogicSyntaxError: If no valid expression starts the string.
+        """
+        node, _ = self.__expression(input_string, 0, _OR_POWER)
+        return [node]
+
+    # Pratt loop
+
+    def __expression(self, s: str, loc: int, min_power: int) -> Tuple[list, int]:
+        left, loc = self.__prefix(s, loc)
+
+        operator, power, end = self.__infix(s, loc)
+        while operator is not None and power >= min_power:
+            # Operators of one precedence level are gathered into a single flat chain
+            level = power
+            chain = [left]
+            while operator is not None and power == level:
+                right, loc = self.__expression(s, end, level + 1)
+                chain += [operator, right]
+                operator, power, end = self.__infix(s, loc)
+            left = chain
+        return left, loc
+
+    def __prefix(self, s: str, loc: int) -> Tuple[list, int]:
+        loc = self.__skip_whitespace(s, loc)
+
+        if self.__keyword_at(s, loc, "!"):
+            operand, loc = self.__expression(s, loc + 1, _PREFIX_POWER)
+            return ['!', operand], loc
+
+        if s.startswith("(", loc):
+            inner, loc = self.__expression(s, loc + 1, _OR_POWER)
+            loc = self.__skip_whitespace(s, loc)
+            if not s.startswith(")", loc):
+                raise BranchingLogicSyntaxError("Expected ')'", s, loc)
+            return inner, loc + 1
+
+        return self.__comparison(s, loc)
+
+    def __infix(self, s: str, loc: int) -> Tuple[Union[str, None], int, int]:
+        """
+        Peek at the infix operator at loc, returning (operator, binding power, end) or
+        (None, 0, loc) if the expression cannot continue there.
+        """
+        loc = self.__skip_whitespace(s, loc)
+
+        operator = self.__comparison_operator(s, loc)
+        if operator is not None:
+            return operator, _COMPARISON_POWER, loc + len(operator)
+        if self.__keyword_at(s, loc, "AND"):
+            return 'AND', _AND_POWER, loc + 3
+        if self.__keyword_at(s, loc, "OR"):
+            return 'OR', _OR_POWER, loc + 2
+        return None, 0, loc
+
+    # Tokens
+
+    def __comparison(self, s: str, loc: int) -> Tuple[list, int]:
+        lhs, loc = self.__field(s, loc)
+
+        loc = self.__skip_whitespace(s, loc)
+        operator = self.__comparison_operator(s, loc)
+        if operator is None:
+            raise BranchingLogicSyntaxError("Expected comparison operator", s, loc)
+
+        loc = self.__skip_whitespace(s, loc + len(operator))
+        value = self.__quoted(s, loc, '"', '"') or self.__quoted(s, loc, "'", "'")
+        if value is None:
+            raise BranchingLogicSyntaxError("Expected quoted value", s, loc)
+        return [lhs, operator, value[0]], value[1]
+
+    def __field(self, s: str, loc: int) -> Tuple[Union[myField, str], int]:
+        """
+        Match the first of: [event][field(check)], [event][field], [field(check)], [field], or
+        a quoted value. As with pyparsing's MatchFirst, the first alternative that matches wins.
+        """
+        event = self.__quoted(s, loc, "[", "]")
+        if event is not None:
+            after_event = self.__skip_whitespace(s, event[1])
+            checkbox = self.__checkbox(s, after_event)
+            if checkbox is not None:
+                (field, check), end = checkbox
+                return self.field_table.intern(field, event=event[0], check=check), end
+            variable = self.__quoted(s, after_event, "[", "]")
+            if variable is not None:
+                return self.field_table.intern(variable[0], event=event[0]), variable[1]
+
+        checkbox = self.__checkbox(s, loc)
+        if checkbox is not None:
+            (field, check), end = checkbox
+            return self.field_table.intern(field, event=None, check=check), end
+
+        if event is not None:
+            return self.field_table.intern(event[0]), event[1]
+
+        value = self.__quoted(s, loc, '"', '"') or self.__quoted(s, loc, "'", "'")
+        if value is not None:
+            return value
+        raise BranchingLogicSyntaxError("Expected field or quoted value", s, loc)
+
+    def __checkbox(self, s: str, loc: int) -> Union[Tuple[Tuple[str, str], int], None]:
+        """
+        Match "[" word "(" check ")" "]", with whitespace allowed between the parts.
+        """
+        if not s.startswith("[", loc):
+            return None
+        start = loc = self.__skip_whitespace(s, loc + 1)
+        while loc < len(s) and s[loc] in _WORD_CHARS:
+            loc += 1
+        if loc == start:
+            return None
+        field = s[start:loc]
+
+        check = self.__quoted(s, self.__skip_whitespace(s, loc), "(", ")")
+        if check is None:
+            return None
+        loc = self.__skip_whitespace(s, check[1])
+        if not s.startswith("]", loc):
+            return None
+        return (field, check[0]), loc + 1
+
+    def __quoted(self, s: str, loc: int, quote: str, end_quote: str) -> Union[Tuple[str, int], None]:
+        """
+        Match a single-line string between quote and end_quote, returning (contents, end).
+        """
+        if not s.startswith(quote, loc):
+            return None
+        end = loc + 1
+        while end < len(s) and s[end] not in (end_quote, "\n", "\r"):
+            end += 1
+        if end == len(s) or s[end] != end_quote:
+            return None
+        contents = s[loc + 1:end]
+        if "\\" in contents:
+            contents = _ESCAPES.sub(lambda match: _ESCAPED[match[1]], contents)
+        return contents, end + 1
+
+    def __comparison_operator(self, s: str, loc: int) -> Union[str, None]:
+        for operator in _COMPARISON_OPERATORS:
+            if s.startswith(operator, loc):
+                return operator
+        return None
+
+    def __keyword_at(self, s: str, loc: int, keyword: str) -> bool:
+        """
+        Caseless keyword match that, like pyparsing's Keyword, refuses to match inside a word.
+        """
+        end = loc + len(keyword)
+        if s[loc:end].upper() != keyword:
+            return False
+        if end < len(s) and s[end] in _KEYWORD_CHARS:
+            return False
+        return loc == 0 or s[loc - 1] not in _KEYWORD_CHARS
+
+    def __skip_whitespace(self, s: str, loc: int) -> int:
+        while loc < len(s) and s[loc] in _WHITESPACE:
+            loc += 1
+        return loc
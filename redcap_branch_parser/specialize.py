@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+from typing import Mapping, Union
+from .compiler import compile_ast
+from .logic_ast import NOT, lookup_key, root, is_constant, is_comparison, is_negation, split_chain, join_chain
+from .myfield import myField
+
+class _Specializer:
+    def __init__(self, known_values: Mapping, field_types: Mapping[str, str]) -> None:
+        self.known_values = known_values
+        self.field_types = field_types
+
+    def comparison(self, node: list) -> list:
+        lhs = node[0]
+        if isinstance(lhs, myField) and lookup_key(lhs) not in self.known_values:
+            return node
+        # Decided exactly as every evaluator would decide it, typed comparisons included
+        return [compile_ast(node, self.field_types)(self.known_values)]
+
+    def negation(self, node: list) -> list:
+        operand = self.node(node[1])
+        if is_constant(operand):
+            return [not operand[0]]
+        if operand is node[1]:
+            return node
+        return [NOT, operand]
+
+    def chain(self, node: list) -> list:
+        operator, operands = split_chain(node)
+        # AND is decided by a False operand and unaffected by a True one; OR the other way round
+        decided = operator == 'OR'
+        residual = []
+        for operand in operands:
+            operand = self.node(operand)
+            if is_constant(operand):
+                if operand[0] == decided:
+                    return [decided]
+                continue
+            residual.append(operand)
+        if not residual:
+            return [not decided]
+        if len(residual) == 1:
+            return residual[0]
+        if len(residual) == len(operands) and all(new is old for new, old in zip(residual, operands)):
+            return node
+        return join_chain(operator, residual)
+
+    def node(self, node: list) -> list:
+        if is_comparison(node):
+            return self.comparison(node)
+        if is_constant(node):
+            return node
+        if is_negation(node):
+            return self.negation(node)
+        return self.chain(node)
+
+def specialize(ast: list, known_values: Mapping, field_types: Union[Mapping[str, str], None] = None) -> list:
+    """
+    Partially evaluate an AST for fields whose values are already known, such as project- or
+    site-level fields that are fixed per deployment.
+
+    Comparisons on known fields (and between two quoted values) are decided now, and the
+    constants they leave are folded away: an AND with a False operand is False and a True
+    operand is dropped from it, and the other way round for OR. What is left only refers to
+    the fields that are not known, or is the constant [True] or [False].
+
+    The AST given is not modified; unchanged subtrees are shared with the result.
+
+    Args:
+        ast (list): An AST as returned by BranchingLogicParser.create_ast().
+        known_values (Mapping): Values keyed like records, by column name (or (event, column)).
+        field_types (Mapping[str, str], optional): Comparison types of numeric and date fields.
+    Returns:
+        list: The residual AST, in the same form as create_ast() returns.
+    """
+    return [_Specializer(known_values, field_types or {}).node(root(ast))]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+from typing import List, Mapping, NamedTuple, Union
+from .myfield import myField
+from .coercion import typed_comparison
+from .logic_ast import root, is_constant, is_comparison, is_negation, split_chain, checkbox_column
+
+class SQLPredicate(NamedTuple):
+    """
+    A parameterised SQL boolean expression and its parameters, in placeholder order.
+    """
+    sql: str
+    params: List[str]
+
+def quote_identifier(name: str) -> str:
+    """
+    Quote a table or column name for SQL (SQLite, PostgreSQL, and standard SQL).
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+class _SQLTranslator:
+    def __init__(
+        self, table: str, record_id: str, event_column: str, placeholder: str, field_types: Mapping[str, str],
+    ) -> None:
+        self.field_types = field_types
+        self.table = quote_identifier(table)
+        self.record_id = quote_identifier(record_id)
+        self.event_column = quote_identifier(event_column)
+        self.placeholder = placeholder
+        self.params: List[str] = []
+
+    def parameter(self, value: str) -> str:
+        self.params.append(value)
+        return self.placeholder
+
+    def column(self, field: myField) -> str:
+        name = field.field if field.check is None else checkbox_column(field.field, field.check)
+        if field.event is None:
+            return f"{self.table}.{quote_identifier(name)}"
+        # [event][field] reads the same record's row for that event
+        return (
+            f"(SELECT CAST(event_row.{quote_identifier(name)} AS TEXT) FROM {self.table} AS event_row"
+            f" WHERE event_row.{self.record_id} = {self.table}.{self.record_id}"
+            f" AND event_row.{self.event_column} = {self.parameter(field.event)})"
+        )
+
+    def translate(self, node: list) -> str:
+        if is_comparison(node):
+            lhs, symbol, expected = node
+            if isinstance(lhs, myField):
+                if typed_comparison(lhs, expected, self.field_types)[0] is not None:
+                    raise ValueError(f"Comparisons on {lhs.field} are by value, which SQL translation does not support")
+                # Missing values compare like REDCap's blanks, keeping the predicate two-valued
+                left = f"COALESCE(CAST({self.column(lhs)} AS TEXT), '')"
+            else:
+                left = self.parameter(lhs)
+            return f"{left} {symbol} {self.parameter(expected)}"
+        if is_constant(node):
+            return "1 = 1" if node[0] else "1 = 0"
+        if is_negation(node):
+            return f"NOT ({self.translate(node[1])})"
+        operator, operands = split_chain(node)
+        return "(" + f" {operator} ".join(self.translate(operand) for operand in operands) + ")"
+
+def to_sql(
+    ast: list,
+    table: str = "records",
+    record_id: str = "record_id",
+    event_column: str = "redcap_event_name",
+    placeholder: str = "?",
+    field_types: Union[Mapping[str, str], None] = None,
+) -> SQLPredicate:
+    """
+    Translate a list-based AST into a parameterised SQL predicate over a table that mirrors a
+    REDCap export, one row per record (and event, for longitudinal projects).
+
+    Fields map to columns of the same name, checkbox references [field(code)] to the exported
+    field___code columns, and [event][field] references to a correlated subquery reading the
+    record's row for that event. Values are compared as text, with NULL treated as blank.
+
+    Args:
+        ast (list): An AST as returned by BranchingLogicParser.create_ast().
+        table (str): The table the predicate filters.
+        record_id (str): The record ID column, used to join event rows.
+        event_column (str): The event name column of longitudinal exports.
+        placeholder (str): The driver's parameter marker, "?" for sqlite3 or "%s" for psycopg.
+        field_types (Mapping[str, str], optional): The comparison type of numeric and date
+            fields (see compiler.compile_ast).
+    Returns:
+        SQLPredicate: The WHERE clause expression and its parameters.
+    Raises:
+        ValueError: If a comparison on a numeric or date field would be made by value, as the
+            other evaluators make it, rather than as text.
+    """
+    translator = _SQLTranslator(table, record_id, event_column, placeholder, field_types or {})
+    sql = translator.translate(root(ast))
+    return SQLPredicate(sql, translator.params)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import pandas as pd
+from typing import IO, Iterator, Tuple, Union
+from .events import EVENT_COLUMN, EventIndex
+from .plan import VisibilityPlan
+
+def _record_chunks(reader, record_id: Union[str, None]) -> Iterator[pd.DataFrame]:
+    """
+    Regroup the chunks of a CSV reader so that every record's rows fall in a single chunk.
+
+    REDCap exports list all the rows (events) of a record together, so only the last record of
+    a chunk can continue into the next; its rows are held back and prepended to that chunk.
+    """
+    pending = None
+    for chunk in reader:
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        key = record_id if record_id is not None else chunk.columns[0]
+        ids = chunk[key]
+        boundary = len(chunk)
+        while boundary > 0 and ids.iat[boundary - 1] == ids.iat[-1]:
+            boundary -= 1
+        pending = chunk.iloc[boundary:]
+        if boundary:
+            yield chunk.iloc[:boundary]
+    if pending is not None and len(pending):
+        yield pending
+
+def stream_csv(
+    plan: VisibilityPlan,
+    source: Union[str, os.PathLike, IO],
+    chunksize: int = 10000,
+    record_id: Union[str, None] = None,
+    event_column: str = EVENT_COLUMN,
+) -> Iterator[Tuple[str, Union[str, None], str, bool]]:
+    """
+    Evaluate a plan against a REDCap CSV export without loading the whole export into memory.
+
+    The export is read chunksize rows at a time, as strings with blank cells kept blank, and
+    each chunk is evaluated column-wise by the plan. Chunks are cut on record boundaries, so
+    all the rows of a record are evaluated together and [event][field] references resolve.
+
+    Args:
+        plan (VisibilityPlan): The compiled data dictionary, see compile_data_dictionary().
+        source (Union[str, os.PathLike, IO]): The path of the export, or an open text file.
+        chunksize (int): Number of rows read at a time.
+        record_id (str, optional): The record ID column. Defaults to the first column, as in
+            REDCap exports.
+        event_column (str): The event name column of longitudinal exports. If the export has
+            no such column, every event is None.
+    Yields:
+        Tuple[str, Union[str, None], str, bool]: (record_id, event, field, visible) for every
+        row of the export and every field of the plan, in export and data dictionary order.
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be positive, got {chunksize}")
+    with pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunksize) as reader:
+        for chunk in _record_chunks(reader, record_id):
+            matrix = plan.evaluate(chunk, EventIndex(chunk, record_id, event_column)).to_numpy()
+            ids = chunk[record_id if record_id is not None else chunk.columns[0]].tolist()
+            if event_column in chunk.columns:
+                events = chunk[event_column].tolist()
+            else:
+                events = [None] * len(chunk)
+            for row, (record, event) in enumerate(zip(ids, events)):
+                for column, field in enumerate(plan.fields):
+                    yield record, event, field, bool(matrix[row, column])
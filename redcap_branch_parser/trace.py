@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import logging
+from typing import Callable, NamedTuple, Union
+from .myfield import myField
+
+class TraceEvent(NamedTuple):
+    """
+    One comparison made while evaluating a rule: the field and the value looked up for it,
+    the operator and the value it was compared with, and the outcome.
+    """
+    field: myField
+    operator: str
+    expected: str
+    value: object
+    result: bool
+
+    def __str__(self) -> str:
+        return f"{self.field} {self.operator} '{self.expected}': {self.value!r} -> {self.result}"
+
+Tracer = Callable[[TraceEvent], None]
+
+TRACE_LOGGER = logging.getLogger("redcap_branch_parser.trace")
+
+def log_trace(logger: Union[logging.Logger, None] = None, level: int = logging.DEBUG) -> Tracer:
+    """
+    A tracer that logs every comparison, to the "redcap_branch_parser.trace" logger by default.
+    """
+    if logger is None:
+        logger = TRACE_LOGGER
+
+    def trace(event: TraceEvent) -> None:
+        if logger.isEnabledFor(level):
+            logger.log(level, "%s", event)
+    return trace
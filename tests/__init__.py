@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import unittest
-from redcap_branch_parser import BranchingLogicParser
+from redcap_branch_parser import BranchingLogicParser, redcap_branching_logic_grammar
 
 class REDCapBranchParserTests(unittest.TestCase):
     def setUp(self):
@@ -9,8 +9,13 @@ class REDCapBranchParserTests(unittest.TestCase):
 
     def test_function1(self):
         test_string: str = "[variable]='1'"
-        results = self.parser.parse(test_string)
-        print(results)
+        results = self.parser.parse(test_string, {"variable": "1"})
+        self.assertTrue(results)
+
+    def test_grammar_is_shared(self):
+        other = BranchingLogicParser()
+        self.assertIs(self.parser.grammar, other.grammar)
+        self.assertIs(self.parser.grammar, redcap_branching_logic_grammar())
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
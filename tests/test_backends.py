@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+import pandas as pd
+import pyparsing as pp
+from redcap_branch_parser import (
+    BitmapIndex, BranchingLogicParser, BranchingLogicSyntaxError, assemble, compile_ast, evaluate_ast, evaluate_frame,
+    specialize, to_sql,
+)
+
+VALID = [
+    "[a]='1'",
+    "[a] = \"1\"",
+    "[a]<>'1' OR [b] >= \"4\"",
+    "[a]>'1' and [b]<'2' and [c]<='3'",
+    "[a]='1' or [b]='2' and [c]='3'",
+    "[a]='1' or [b]='2' or [c]='3' and [d]='4'",
+    "([a]='1' or [b]='2') and [c]='3'",
+    "([a]='1' and [b]='2') and [c]='3'",
+    "(([a]='1'))",
+    "![a]='1'",
+    "!![a]='1'",
+    "! [a]='1' and [b]='2'",
+    "!([a]='1' or [b]='2')",
+    "[a]='1' AND ![b]='2' OR [c]='3'",
+    "[a]='1'and[b]='2'",
+    "[a]='1' Or [b]='2'",
+    "[ev][a]='1'",
+    "[ev] [a]='1'",
+    "[a(2)]='1'",
+    "[ a (2) ]='1'",
+    "[ev][a(2)]='1'",
+    "[a(x y)]='1'",
+    "[a-b(2)]='1'",
+    "[ev][a-b(2)]='1'",
+    "[a b]='1'",
+    "[]=''",
+    "[a]=''",
+    "[a]='x y'",
+    "[a]=\"x'y\"",
+    "[a]='x\\ty'",
+    "[a\\b]='1'",
+    "'1'='1' or '2'<'3'",
+    "[a]='1' = '2'='3'",
+    "[a]='1' <> [b]='1'",
+    "[a]\n='1'",
+    "   [a]='1'",
+    # Trailing text that cannot continue the expression is ignored
+    "[a]='1' garbage",
+    "[a]='1' [b]='2'",
+    "[a]='1' && [b]='2'",
+    "[a]='1' andx [b]='2'",
+    "[a]='1' )",
+    "![a]='1' garbage",
+]
+
+INVALID = [
+    "",
+    "[a]",
+    "!",
+    "!!",
+    "!x",
+    "'1'=[a]",
+    "[a]='1' and",
+    "[a]='1' or",
+    "[a]='1' = ",
+    "[a]='1'='2'",
+    "[a]='1' and x",
+    "[a]='1' and [b]='2' and x",
+    "[a]='1' and and [b]='2'",
+    "[a]='1' and! [b]='2'",
+    "[a]='1' and !x",
+    "([a]='1'",
+    "[a]='1' or ([b]='2'",
+    "([a]='1' and x)",
+    "[[a]]='1'",
+    "[e][f][g]='1'",
+    "[a\nb]='1'",
+    "[a]='1\n'",
+]
+
+def random_logic(rng: random.Random, depth: int) -> str:
+    """
+    Generate a random, valid branching logic string.
+    """
+    if depth == 0 or rng.random() < 0.3:
+        field = rng.choice(["[a]", "[b_2]", "[ev][c]", "[d(1)]", "[ev][e(2)]", "'1'"])
+        operator = rng.choice(["=", "<>", ">", ">=", "<", "<="])
+        value = rng.choice(["'1'", '"2"', "''", "'x y'"])
+        return f"{field}{rng.choice(['', ' '])}{operator}{value}"
+    kind = rng.random()
+    if kind < 0.15:
+        return "!" + random_logic(rng, depth - 1)
+    if kind < 0.3:
+        return "(" + random_logic(rng, depth - 1) + ")"
+    operator = rng.choice([" and ", " AND ", " or ", " OR "])
+    return operator.join(random_logic(rng, depth - 1) for _ in range(rng.randint(2, 3)))
+
+class BackendConformanceTests(unittest.TestCase):
+    """
+    The pratt backend must yield exactly the ASTs the pyparsing backend yields.
+    """
+    def setUp(self):
+        self.pyparsing = BranchingLogicParser(cache=None, backend="pyparsing")
+        self.pratt = BranchingLogicParser(cache=None, backend="pratt")
+
+    def assertSameAst(self, logic):
+        self.assertEqual(repr(self.pratt.create_ast(logic)), repr(self.pyparsing.create_ast(logic)), logic)
+
+    def test_valid_strings(self):
+        for logic in VALID:
+            with self.subTest(logic=logic):
+                self.assertSameAst(logic)
+
+    def test_invalid_strings(self):
+        for logic in INVALID:
+            with self.subTest(logic=logic):
+                self.assertRaises(pp.ParseException, self.pyparsing.create_ast, logic)
+                self.assertRaises(BranchingLogicSyntaxError, self.pratt.create_ast, logic)
+
+    def test_random_strings(self):
+        rng = random.Random(20221)
+        for _ in range(300):
+            logic = random_logic(rng, 4)
+            with self.subTest(logic=logic):
+                self.assertSameAst(logic)
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, BranchingLogicParser, backend="antlr")
+
+class BackendEvaluationTests(unittest.TestCase):
+    backend = "pyparsing"
+
+    def setUp(self):
+        self.parser = BranchingLogicParser(cache=None, backend=self.backend)
+
+    def test_evaluation(self):
+        record = {"a": "1", "b": "2", "c": "3"}
+        self.assertTrue(self.parser.parse("[a]='1' and ([b]='0' or ![c]='0')", record))
+        self.assertFalse(self.parser.parse("[a]='1' and [b]='0' or [c]<'3'", record))
+
+    def test_comparison_chains_are_rejected(self):
+        # Accepted by the grammar, but neither AND nor OR joins the comparisons
+        record = {"a": "1", "b": "2"}
+        data_df = pd.DataFrame([record])
+        for logic in ["[a]='1' <> [b]='1'", "[a]='1' = '2'='3'"]:
+            ast = self.parser.create_ast(logic)
+            with self.subTest(logic=logic):
+                self.assertRaises(ValueError, self.parser.parse, logic, record)
+                self.assertRaises(ValueError, self.parser.substitute, ast, record)
+                self.assertRaises(ValueError, compile_ast, ast)
+                self.assertRaises(ValueError, evaluate_ast, ast, record)
+                self.assertRaises(ValueError, assemble, ast)
+                self.assertRaises(ValueError, evaluate_frame, ast, data_df)
+                self.assertRaises(ValueError, BitmapIndex(data_df).evaluate, ast)
+                self.assertRaises(ValueError, to_sql, ast)
+                self.assertRaises(ValueError, specialize, ast, {})
+
+class PrattBackendEvaluationTests(BackendEvaluationTests):
+    backend = "pratt"
+
+if __name__ == '__main__':
+    unittest.main()
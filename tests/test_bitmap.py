@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import BranchingLogicParser, BitmapIndex
+
+class BitmapIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+        rng = np.random.default_rng(7)
+        self.data_df = pd.DataFrame(
+            {
+                "a": rng.integers(0, 3, 200).astype(str),
+                "b": rng.integers(0, 5, 200),
+                "c": rng.choice(["1", "2", None], 200),
+            },
+            index=pd.RangeIndex(1000, 1200, name="record_id"),
+        )
+        self.index = BitmapIndex(self.data_df)
+
+    def test_agrees_with_frame_evaluation(self):
+        for logic in [
+            "[a]='1'",
+            "[a]<>'1' and [b]='2'",
+            "[a]='2' or [b]>'2' or [c]='None'",
+            "!([a]='1' or [b]<='3')",
+            "[a]='9' and [b]='1'",
+            "'1'<>'1' or [c]='1'",
+        ]:
+            ast = self.parser.create_ast(logic)
+            expected = self.parser.evaluate_frame(logic, self.data_df).to_numpy()
+            with self.subTest(logic=logic):
+                np.testing.assert_array_equal(self.index.to_mask(self.index.evaluate(ast)), expected)
+
+    def test_values_that_stringify_alike(self):
+        data_df = pd.DataFrame({"a": pd.Series([1, "1", "2"], dtype=object)})
+        ast = self.parser.create_ast("[a]='1'")
+        index = BitmapIndex(data_df)
+        self.assertEqual(index.to_mask(index.evaluate(ast)).tolist(), [True, True, False])
+        self.assertEqual(self.parser.evaluate_frame("[a]='1'", data_df).tolist(), [True, True, False])
+
+    def test_matching_records(self):
+        ast = self.parser.create_ast("[a]='1'")
+        expected = self.data_df.index[self.data_df["a"] == "1"]
+        self.assertTrue(self.index.matching(ast).equals(expected))
+        self.assertEqual(bin(self.index.evaluate(ast)).count("1"), len(expected))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import pickle
+import unittest
+from redcap_branch_parser import BranchingLogicParser, execute, disassemble
+
+class BytecodeTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+
+    def test_agrees_with_compiled_rules(self):
+        records = [{"a": a, "b": b, "c": c} for a in "01" for b in "12" for c in "23"]
+        for logic in [
+            "[a]='1'",
+            "[a]='1' or [b]='2' and [c]='3'",
+            "[a]<>'1' and [b]>='2' and [c]<'3'",
+            "!([a]='1' or [b]='2') or [c]>'2'",
+            "([a]<='0' or [b]='2') and !![c]='2'",
+            "'1'='1' and [a]='1'",
+        ]:
+            program = self.parser.assemble(logic)
+            rule = self.parser.compile(logic)
+            for record in records:
+                with self.subTest(logic=logic, record=record):
+                    self.assertEqual(execute(program, record), rule(record))
+
+    def test_short_circuits(self):
+        program = self.parser.assemble("[a]='1' or [missing]='1'")
+        self.assertTrue(execute(program, {"a": "1"}))
+        program = self.parser.assemble("[a]='1' and [missing]='1'")
+        self.assertFalse(execute(program, {"a": "0"}))
+
+    def test_program_is_flat_and_serialisable(self):
+        program = self.parser.assemble("[a]='1' and ![b]='1'")
+        self.assertTrue(all(isinstance(word, int) for word in program.code))
+        self.assertEqual(program.constants, ("a", "1", "b"))
+        self.assertEqual(pickle.loads(pickle.dumps(program)), program)
+        self.assertIn("JUMP_IF_FALSE", disassemble(program))
+
+if __name__ == '__main__':
+    unittest.main()
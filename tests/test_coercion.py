@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import math
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser.coercion import typed_comparison
+from redcap_branch_parser.logic_ast import root
+from redcap_branch_parser import (
+    BitmapIndex, BranchingLogicParser, NUMBER, DATE, compile_ast, compile_data_dictionary, disassemble, evaluate_ast, evaluate_frame,
+    execute, field_types, parallel_evaluate, to_date, to_number,
+)
+
+class CoercionTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+        self.types = {"age": NUMBER, "visit": DATE, "meds": NUMBER}
+
+    def test_converters(self):
+        self.assertEqual(to_number("18"), 18.0)
+        self.assertEqual(to_number(2.5), 2.5)
+        self.assertTrue(math.isnan(to_number("")))
+        self.assertTrue(math.isnan(to_number(None)))
+        self.assertEqual(to_date("1970-01-02"), 86400.0)
+        self.assertEqual(to_date("1970-01-01 00:01"), 60.0)
+        self.assertTrue(math.isnan(to_date("not a date")))
+
+    def test_field_types_from_data_dictionary(self):
+        df_datadict = pd.DataFrame(
+            {
+                "field_type": ["text", "text", "calc", "text", "radio", "slider"],
+                "text_validation_type_or_show_slider_number": ["integer", "date_ymd", np.nan, "email", np.nan, np.nan],
+            },
+            index=pd.Index(["age", "visit", "bmi", "email", "sex", "pain"], name="field_name"),
+        )
+        self.assertEqual(
+            field_types(df_datadict),
+            {"age": NUMBER, "visit": DATE, "bmi": NUMBER, "pain": NUMBER},
+        )
+
+    def test_numeric_comparisons_compare_values(self):
+        ast = self.parser.create_ast("[age] >= '18'")
+        self.assertTrue(compile_ast(ast)({"age": "9"}))  # '9' >= '18' as strings
+        self.assertFalse(compile_ast(ast, self.types)({"age": "9"}))
+        self.assertTrue(compile_ast(ast, self.types)({"age": "18.0"}))
+        self.assertTrue(compile_ast(self.parser.create_ast("[age] = '18'"), self.types)({"age": 18}))
+
+    def test_blanks_and_non_numeric_literals(self):
+        rule = compile_ast(self.parser.create_ast("[age] > '1'"), self.types)
+        self.assertFalse(rule({"age": ""}))
+        self.assertTrue(compile_ast(self.parser.create_ast("[age] <> '1'"), self.types)({"age": ""}))
+        # A literal that is not a number keeps the comparison on strings
+        self.assertTrue(compile_ast(self.parser.create_ast("[age] = ''"), self.types)({"age": ""}))
+        self.assertFalse(compile_ast(self.parser.create_ast("[age] <> ''"), self.types)({"age": ""}))
+
+    def test_dates_and_checkboxes(self):
+        rule = compile_ast(self.parser.create_ast("[visit] < '2023-02-01'"), self.types)
+        self.assertTrue(rule({"visit": "2023-01-15"}))
+        self.assertFalse(rule({"visit": "2023-02-01 10:00"}))
+        # Checkbox choices compare as strings whatever their field's type
+        field = root(self.parser.create_ast("[meds(1)] = '1'"))[0]
+        self.assertEqual(typed_comparison(field, "1", self.types), (None, None))
+
+    def test_frame_matches_compiled_rule(self):
+        data_df = pd.DataFrame({
+            "age": ["9", "18", "", "100", 17, None, "abc"],
+            "visit": ["2023-01-01", "", "2024-12-31", "2023-06-01", None, "x", "2023-06-01 12:00"],
+        })
+        records = data_df.to_dict("records")
+        for logic in ("[age] >= '18'", "[age] < '10' or [age] = ''", "[visit] > '2023-06-01'", "![age] <> '17'"):
+            with self.subTest(logic=logic):
+                ast = self.parser.create_ast(logic)
+                rule = compile_ast(ast, self.types)
+                expected = [rule(record) for record in records]
+                self.assertEqual(evaluate_frame(ast, data_df, self.types).tolist(), expected)
+
+    def test_every_backend_compares_values(self):
+        parser = BranchingLogicParser(field_types=self.types)
+        logic = "[age] >= '18' and [visit] < '2023-02-01'"
+        records = [
+            {"age": "9", "visit": "2023-01-15"},
+            {"age": "18.0", "visit": "2023-01-15"},
+            {"age": "", "visit": "2023-01-15"},
+            {"age": "65", "visit": "2023-02-01 10:00"},
+        ]
+        expected = [False, True, False, False]
+        ast = parser.create_ast(logic)
+        program = parser.assemble(logic)
+        self.assertIn("LOAD_NUMBER", disassemble(program))
+        self.assertEqual([execute(program, record) for record in records], expected)
+        self.assertEqual([evaluate_ast(ast, record, field_types=self.types) for record in records], expected)
+        self.assertEqual([parser.parse(logic, record) for record in records], expected)
+        self.assertEqual([parser.evaluate(parser.substitute(ast, record)) for record in records], expected)
+        self.assertEqual([result for result, in parallel_evaluate([logic], records, workers=1, parser=parser)], expected)
+        bitmap = BitmapIndex(pd.DataFrame(records), field_types=self.types)
+        self.assertEqual(bitmap.to_mask(bitmap.evaluate(ast)).tolist(), expected)
+
+    def test_sql_rejects_typed_comparisons(self):
+        parser = BranchingLogicParser(field_types=self.types)
+        self.assertRaises(ValueError, parser.to_sql, "[age] >= '18'")
+        # Checkbox choices and untyped fields still translate
+        self.assertEqual(parser.to_sql("[meds(1)] = '1' and [sex] = '1'").params, ["1", "1"])
+
+    def test_plan_uses_validation_types(self):
+        df_datadict = pd.DataFrame(
+            {
+                "field_type": ["text", "text"],
+                "text_validation_type_or_show_slider_number": ["integer", np.nan],
+                "branching_logic": [np.nan, "[age] >= '18'"],
+            },
+            index=pd.Index(["age", "alcohol"], name="field_name"),
+        )
+        data_df = pd.DataFrame({"age": ["9", "18", "65"]})
+        matrix = compile_data_dictionary(df_datadict).evaluate(data_df)
+        self.assertEqual(matrix["alcohol"].tolist(), [False, True, True])
+
+if __name__ == '__main__':
+    unittest.main()
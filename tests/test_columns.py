@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import (
+    BranchingLogicParser, ColumnTable, EventIndex, assemble, compile_ast, evaluate_ast, evaluate_frame, execute, to_sql,
+)
+
+class ColumnTableTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+        self.df_datadict = pd.DataFrame(
+            {
+                "form_name": ["demo", "demo", "demo", "meds", "meds"],
+                "field_type": ["text", "descriptive", "radio", "checkbox", "yesno"],
+                "select_choices_or_calculations": [np.nan, np.nan, "1, A | 2, B", "1, Aspirin | 2, Statin | Other, Other", np.nan],
+            },
+            index=pd.Index(["record_id", "intro", "sex", "meds", "smoker"], name="field_name"),
+        )
+
+    def test_export_columns(self):
+        self.assertEqual(
+            ColumnTable.from_data_dictionary(self.df_datadict).columns,
+            ["record_id", "sex", "demo_complete", "meds___1", "meds___2", "meds___other", "smoker", "meds_complete"],
+        )
+        columns = ColumnTable.from_data_dictionary(self.df_datadict, longitudinal=True).columns
+        self.assertEqual(columns[:3], ["record_id", "redcap_event_name", "sex"])
+
+    def test_checkbox_references_resolve_to_positions(self):
+        table = ColumnTable.from_data_dictionary(self.df_datadict)
+        field = self.parser.create_ast("[meds(Other)]='1'")[0][0]
+        self.assertEqual(table.key(field), 5)
+        self.assertEqual(table.key(self.parser.create_ast("[ev][meds(2)]='1'")[0][0]), ("ev", 4))
+        self.assertRaises(KeyError, table.key, self.parser.create_ast("[meds(9)]='1'")[0][0])
+
+    def test_evaluators_read_rows_by_position(self):
+        table = ColumnTable.from_data_dictionary(self.df_datadict)
+        rows = [
+            ("1", "1", "2", "1", "0", "0", "0", "2"),
+            ("2", "2", "2", "0", "1", "1", "1", "2"),
+        ]
+        logic = "[meds(2)]='1' or ([sex]='1' and [meds(1)]='1')"
+        ast = self.parser.create_ast(logic)
+        rule = compile_ast(ast, columns=table)
+        program = assemble(ast, table)
+        self.assertEqual([rule(row) for row in rows], [True, True])
+        self.assertEqual([execute(program, row) for row in rows], [True, True])
+        self.assertEqual([evaluate_ast(ast, row, columns=table) for row in rows], [True, True])
+        self.assertFalse(evaluate_ast(self.parser.create_ast("[meds(other)]='1'"), rows[0], columns=table))
+
+    def test_checkbox_references_read_exported_columns(self):
+        data_df = pd.DataFrame({"meds___1": ["1", "0"], "meds___other": ["0", "1"]})
+        ast = self.parser.create_ast("[meds(1)]='1' or [meds(Other)]='1'")
+        self.assertEqual(evaluate_frame(ast, data_df).tolist(), [True, True])
+        self.assertTrue(self.parser.compile("[meds(1)]='1'")({"meds___1": "1"}))
+        self.assertIn('"meds___other"', to_sql(ast).sql)
+
+    def test_event_records_accept_positions(self):
+        data_df = pd.DataFrame({
+            "record_id": ["1", "1"],
+            "redcap_event_name": ["baseline", "followup"],
+            "meds___1": ["1", "0"],
+        })
+        table = ColumnTable(data_df.columns)
+        rule = self.parser.compile("[baseline][meds(1)]='1' and [meds(1)]='0'")
+        positional = compile_ast(self.parser.create_ast("[baseline][meds(1)]='1' and [meds(1)]='0'"), columns=table)
+        records = [record for _, _, record in EventIndex(data_df).records()]
+        self.assertEqual([rule(record) for record in records], [False, True])
+        self.assertEqual([positional(record) for record in records], [False, True])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import unittest
+from redcap_branch_parser import BranchingLogicParser, compile_ast
+
+class CompilerTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+
+    def test_comparison_operators(self):
+        record = {"a": "2"}
+        cases = {
+            "[a]='2'": True, "[a]<>'2'": False, "[a]>'1'": True,
+            "[a]>='3'": False, "[a]<'3'": True, "[a]<='1'": False,
+        }
+        for logic, expected in cases.items():
+            with self.subTest(logic=logic):
+                self.assertEqual(self.parser.compile(logic)(record), expected)
+
+    def test_boolean_operators_and_precedence(self):
+        rule = self.parser.compile("[a]='1' or [b]='2' and [c]='3'")
+        self.assertTrue(rule({"a": "1", "b": "0", "c": "0"}))
+        self.assertFalse(rule({"a": "0", "b": "2", "c": "0"}))
+        rule = self.parser.compile("([a]='1' or [b]='2') and [c]='3' and [d]='4'")
+        self.assertTrue(rule({"a": "0", "b": "2", "c": "3", "d": "4"}))
+        self.assertFalse(rule({"a": "1", "b": "2", "c": "3", "d": "0"}))
+
+    def test_negation(self):
+        rule = self.parser.compile("!([a]='1' or [b]='2')")
+        self.assertTrue(rule({"a": "0", "b": "0"}))
+        self.assertFalse(rule({"a": "0", "b": "2"}))
+
+    def test_values_are_stringified_and_short_circuited(self):
+        rule = compile_ast(self.parser.create_ast("[a]='1' or [missing]='1'"))
+        self.assertTrue(rule({"a": 1}))
+        self.assertTrue(self.parser.compile("'1'='1'")({}))
+
+    def test_parse_matches_compiled_rule(self):
+        logic = "[a]='1' and [b]<>'2'"
+        record = {"a": "1", "b": "3"}
+        self.assertEqual(self.parser.parse(logic, record), self.parser.compile(logic)(record))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import BranchingLogicParser, FrameEvaluator, SharedExpressions, compile_ast, compile_data_dictionary
+
+class SharedExpressionsTests(unittest.TestCase):
+    def setUp(self):
+        parser = BranchingLogicParser()
+        self.logic = {
+            "a": "[consent]='1' and [age]>'17'",
+            "b": "[consent]='1' and [sex]='2'",
+            "c": "[consent]='1' and [age]>'17' and [sex]='2'",
+            "d": "!([consent]='1' and [sex]='2') or [age]>'17'",
+        }
+        self.rules = {name: parser.create_ast(logic) for name, logic in self.logic.items()}
+        self.data_df = pd.DataFrame({
+            "consent": ["1", "1", "0", "1"],
+            "age": ["30", "10", "50", ""],
+            "sex": ["2", "2", "1", "1"],
+        })
+
+    def test_identical_subtrees_are_stored_once(self):
+        shared = SharedExpressions(self.rules)
+        # 3 distinct comparisons, 3 distinct chains (a, b, c) and one negation and chain for d
+        self.assertEqual(len(shared), 8)
+        info = shared.info()
+        self.assertEqual(info.nodes, 3 + 3 + 4 + 6)
+        self.assertEqual(info.unique, 8)
+        self.assertAlmostEqual(info.ratio, 16 / 8)
+        # d negates the node b evaluates to
+        operator, (negation, _) = shared.nodes[shared.roots["d"]]
+        self.assertEqual(operator, 'OR')
+        self.assertEqual(shared.nodes[negation], ('!', shared.roots["b"]))
+
+    def test_results_match_independent_evaluation(self):
+        shared = SharedExpressions(self.rules)
+        frame = shared.evaluate_frame(FrameEvaluator(self.data_df))
+        for name, ast in self.rules.items():
+            rule = compile_ast(ast)
+            expected = [rule(record) for record in self.data_df.to_dict("records")]
+            self.assertEqual(frame[name].tolist(), expected, name)
+        for record in self.data_df.to_dict("records"):
+            self.assertEqual(
+                shared.evaluate_record(record),
+                {name: compile_ast(ast)(record) for name, ast in self.rules.items()},
+            )
+
+    def test_each_comparison_is_evaluated_once(self):
+        shared = SharedExpressions(self.rules)
+        evaluator = FrameEvaluator(self.data_df)
+        with mock.patch.object(evaluator, "evaluate_node", wraps=evaluator.evaluate_node) as evaluate_node:
+            shared.evaluate_frame(evaluator)
+        self.assertEqual(evaluate_node.call_count, 3)
+
+    def test_plan_shares_subexpressions(self):
+        df_datadict = pd.DataFrame(
+            {"branching_logic": [np.nan, np.nan, np.nan, *self.logic.values()]},
+            index=pd.Index(["consent", "age", "sex", *self.logic], name="field_name"),
+        )
+        plan = compile_data_dictionary(df_datadict)
+        self.assertEqual(plan.sharing().unique, 8)
+        matrix = plan.evaluate(self.data_df)
+        for position, record in enumerate(self.data_df.to_dict("records")):
+            self.assertEqual(plan.evaluate_record(record), matrix.iloc[position].to_dict())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import NUMBER, IncrementalEvaluator, compile_data_dictionary, myField
+
+class IncrementalEvaluatorTests(unittest.TestCase):
+    def setUp(self):
+        self.records = {
+            1: {"consent": "1", "age": "30", "sex": "2"},
+            2: {"consent": "0", "age": "", "sex": "1"},
+        }
+        self.evaluator = IncrementalEvaluator.from_strings(
+            {
+                "age": "[consent]='1'",
+                "pregnant": "[consent]='1' and [sex]='2'",
+                "notes": "[age]<>''",
+            },
+            self.records,
+        )
+
+    def test_reverse_index(self):
+        self.assertEqual(self.evaluator.dependents[myField("consent")], {"age", "pregnant"})
+        self.assertEqual(self.evaluator.affected_rules(["sex"]), {"pregnant"})
+        self.assertEqual(self.evaluator.affected_rules(["unused"]), set())
+
+    def test_update_returns_visibility_diff(self):
+        self.assertEqual(self.evaluator.results[1], {"age": True, "pregnant": True, "notes": True})
+        self.assertEqual(self.evaluator.update(1, {"sex": "1"}), {"pregnant": False})
+        self.assertEqual(self.evaluator.update(1, {"sex": "1"}), {})
+        self.assertEqual(self.evaluator.update(2, {"consent": "1", "age": "40"}), {"age": True, "notes": True})
+        self.assertEqual(self.records[2]["age"], "40")
+
+    def test_from_plan(self):
+        df_datadict = pd.DataFrame(
+            {"branching_logic": [None, "[consent]='1'"]},
+            index=pd.Index(["consent", "age"], name="field_name"),
+        )
+        evaluator = IncrementalEvaluator.from_plan(compile_data_dictionary(df_datadict), self.records)
+        self.assertEqual(evaluator.results, {1: {"age": True}, 2: {"age": False}})
+        self.assertEqual(evaluator.update(2, {"consent": "1"}), {"age": True})
+
+    def test_typed_fields(self):
+        df_datadict = pd.DataFrame(
+            {
+                "branching_logic": [np.nan, "[age]>='18'"],
+                "field_type": ["text", "yesno"],
+                "text_validation_type_or_show_slider_number": ["integer", np.nan],
+            },
+            index=pd.Index(["age", "adult_q"], name="field_name"),
+        )
+        plan = compile_data_dictionary(df_datadict)
+        records = {1: {"age": "9"}, 2: {"age": "30"}}
+        evaluator = IncrementalEvaluator.from_plan(plan, records)
+        self.assertEqual(plan.evaluate(pd.DataFrame([{"age": "9"}, {"age": "30"}]))["adult_q"].tolist(), [False, True])
+        self.assertEqual(evaluator.results, {1: {"adult_q": False}, 2: {"adult_q": True}})
+        self.assertEqual(evaluator.update(1, {"age": "18"}), {"adult_q": True})
+
+        strings = IncrementalEvaluator.from_strings({"adult_q": "[age]>='18'"}, {1: {"age": "9"}}, field_types={"age": NUMBER})
+        self.assertEqual(strings.results, {1: {"adult_q": False}})
+
+if __name__ == '__main__':
+    unittest.main()
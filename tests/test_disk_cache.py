@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from redcap_branch_parser import BranchingLogicParser, CompiledRuleCache, FieldTable, execute
+
+class CompiledRuleCacheTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "rules.sqlite")
+
+    def test_second_process_loads_instead_of_parsing(self):
+        logic = "[a]='1' and [ev][b(2)]<>'0'"
+        with CompiledRuleCache(self.path) as disk_cache:
+            expected = BranchingLogicParser(cache=None, disk_cache=disk_cache).create_ast(logic)
+            self.assertEqual(len(disk_cache), 1)
+
+        with CompiledRuleCache(self.path) as disk_cache:
+            parser = BranchingLogicParser(cache=None, disk_cache=disk_cache)
+            with mock.patch.object(parser.grammar, "parse_string", side_effect=AssertionError("parsed")):
+                ast = parser.create_ast(logic)
+            self.assertEqual(repr(ast), repr(expected))
+            self.assertIs(ast[0][0][0], expected[0][0][0])
+            self.assertTrue(execute(disk_cache.get(logic).program, {"a": "1", ("ev", "b___2"): "1"}))
+            self.assertEqual((disk_cache.hits, disk_cache.misses), (2, 0))
+
+    def test_assemble_loads_the_stored_program(self):
+        logic = "[a]='1' or [b]<>'2'"
+        with CompiledRuleCache(self.path) as disk_cache:
+            expected = BranchingLogicParser(cache=None, disk_cache=disk_cache).assemble(logic)
+
+        with CompiledRuleCache(self.path) as disk_cache:
+            parser = BranchingLogicParser(cache=None, disk_cache=disk_cache)
+            with mock.patch("redcap_branch_parser.branching_logic_parser.assemble", side_effect=AssertionError("assembled")):
+                program = parser.assemble(logic)
+            self.assertEqual(program, expected)
+            self.assertTrue(execute(program, {"a": "2", "b": "1"}))
+            self.assertEqual((disk_cache.hits, disk_cache.misses), (1, 0))
+
+    def test_disk_cache_is_queried_once_per_miss(self):
+        with CompiledRuleCache(self.path) as disk_cache:
+            parser = BranchingLogicParser(disk_cache=disk_cache)
+            program = parser.assemble("[a]='1' and [c]='3'")
+            self.assertEqual((disk_cache.hits, disk_cache.misses), (0, 1))
+            self.assertIs(parser.assemble("[a]='1' and [c]='3'"), program)
+            self.assertEqual((disk_cache.hits, disk_cache.misses), (0, 1))
+
+    def test_programs_are_stored_per_field_types(self):
+        logic = "[age] >= '18'"
+        with CompiledRuleCache(self.path) as disk_cache:
+            untyped = BranchingLogicParser(cache=None, disk_cache=disk_cache).assemble(logic)
+            typed = BranchingLogicParser(cache=None, field_types={"age": "number"}, disk_cache=disk_cache).assemble(logic)
+            self.assertEqual(len(disk_cache), 2)
+            self.assertTrue(execute(untyped, {"age": "9"}))
+            self.assertFalse(execute(typed, {"age": "9"}))
+            self.assertFalse(execute(disk_cache.get(logic, {"age": "number"}).program, {"age": "9"}))
+
+    def test_version_mismatch_and_field_tables(self):
+        with CompiledRuleCache(self.path) as disk_cache:
+            BranchingLogicParser(cache=None, disk_cache=disk_cache).create_ast("[a]='1'")
+        with CompiledRuleCache(self.path, version="other") as disk_cache:
+            self.assertIsNone(disk_cache.get("[a]='1'"))
+
+        table = FieldTable()
+        with CompiledRuleCache(self.path) as disk_cache:
+            parser = BranchingLogicParser(cache=None, field_table=table, disk_cache=disk_cache)
+            self.assertIs(parser.create_ast("[a]='1'")[0][0], table.intern("a"))
+
+if __name__ == '__main__':
+    unittest.main()
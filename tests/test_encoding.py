@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import BranchingLogicParser, encode_values, parse_choices
+
+class EncodingTests(unittest.TestCase):
+    def test_parse_choices(self):
+        self.assertEqual(parse_choices("1, Yes | 0, No"), ["1", "0"])
+        self.assertEqual(parse_choices("a, Alpha, with comma|b,Beta"), ["a", "b"])
+
+    def test_encoding_is_lossless_and_small(self):
+        values = pd.Series(["a", "z", "", "b", "a"])
+        codes, categories = encode_values(values, ["a", "b"])
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertEqual(categories, ["a", "b", "z", ""])
+        self.assertEqual([categories[code] for code in codes], [str(value) for value in values])
+
+    def test_values_that_stringify_alike_share_a_code(self):
+        data_df = pd.DataFrame({"a": [1, "1", 2, "2"]})
+        parser = BranchingLogicParser()
+        self.assertEqual(parser.evaluate_frame("[a]='1'", data_df).tolist(), [True, True, False, False])
+        self.assertEqual(parser.evaluate_frame("[a]<>'2'", data_df).tolist(), [True, True, False, False])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import unittest
+from redcap_branch_parser import BranchingLogicParser, LookupCounter, evaluate_ast
+
+class ShortCircuitEvaluatorTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+
+    def test_skips_decided_operands(self):
+        ast = self.parser.create_ast("[a]='1' or ([b]='2' and [c]='3' and [d]='4')")
+        counter = LookupCounter()
+        # [b], [c] and [d] are absent, so looking any of them up would raise
+        self.assertTrue(evaluate_ast(ast, {"a": "1"}, counter))
+        self.assertEqual((counter.performed, counter.skipped), (1, 3))
+
+        counter.reset()
+        ast = self.parser.create_ast("[a]='1' and [b]='2' and [c]='3'")
+        self.assertFalse(evaluate_ast(ast, {"a": "1", "b": "0"}, counter))
+        self.assertEqual((counter.performed, counter.skipped), (2, 1))
+
+    def test_agrees_with_compiled_rules(self):
+        records = [{"a": a, "b": b, "c": c} for a in "01" for b in "12" for c in "23"]
+        for logic in [
+            "[a]='1' or [b]='2' and [c]='3'",
+            "!([a]='1' or [b]='2') or [c]>='3'",
+            "([a]<>'1' and [b]='2') or !![c]='2'",
+        ]:
+            ast = self.parser.create_ast(logic)
+            rule = self.parser.compile(logic)
+            for record in records:
+                with self.subTest(logic=logic, record=record):
+                    self.assertEqual(evaluate_ast(ast, record), rule(record))
+
+if __name__ == '__main__':
+    unittest.main()
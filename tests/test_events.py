@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import (
+    BitmapIndex, BranchingLogicParser, EventIndex, assemble, compile_data_dictionary, evaluate_ast, evaluate_frame, execute, stream_csv,
+)
+
+class EventIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+        self.data_df = pd.DataFrame({
+            "record_id": ["1", "1", "2", "3", "3"],
+            "redcap_event_name": ["baseline", "followup", "baseline", "followup", "baseline"],
+            "a": ["1", "2", "1", "", "2"],
+            "b": ["x", "y", "z", "w", "v"],
+        })
+        self.index = EventIndex(self.data_df)
+
+    def test_column_joins_event_rows(self):
+        self.assertEqual(self.index.column("baseline", "a").tolist(), ["1", "1", "1", "2", "2"])
+        # Record 2 has no followup row, so its value is blank
+        self.assertEqual(self.index.column("followup", "b").tolist(), ["y", "y", "", "w", "w"])
+        self.assertEqual(self.index.position("3", "baseline"), 4)
+        self.assertIsNone(self.index.position("2", "followup"))
+
+    def test_records_resolve_cross_event_keys(self):
+        record = self.index.record("1", "followup")
+        self.assertEqual(record["a"], "2")
+        self.assertEqual(record[("baseline", "a")], "1")
+        self.assertEqual(self.index.record("2", "baseline")[("followup", "a")], "")
+        self.assertRaises(KeyError, self.index.record, "2", "followup")
+
+    def test_cells_by_name_and_position(self):
+        self.assertEqual(self.index.cell(3, "b"), "w")
+        self.assertEqual(self.index.cell(3, 3), "w")
+        self.assertEqual(self.index.record_id(3), "3")
+        record = self.index.record("3", "followup")
+        self.assertEqual((record[2], record[("baseline", 3)]), ("", "v"))
+        self.assertRaises(KeyError, record.__getitem__, "missing")
+
+    def test_evaluators_agree(self):
+        for logic in ("[baseline][a]='1'", "[baseline][a]='1' and [b]<>'x'", "![followup][b]='' or [a]='2'"):
+            with self.subTest(logic=logic):
+                ast = self.parser.create_ast(logic)
+                program = assemble(ast)
+                expected = [evaluate_ast(ast, record) for _, _, record in self.index.records()]
+                self.assertEqual([execute(program, record) for _, _, record in self.index.records()], expected)
+                self.assertEqual([self.parser.compile(logic)(record) for _, _, record in self.index.records()], expected)
+                self.assertEqual(evaluate_frame(ast, self.data_df).tolist(), expected)
+                bitmaps = BitmapIndex(self.data_df)
+                self.assertEqual(bitmaps.to_mask(bitmaps.evaluate(ast)).tolist(), expected)
+        self.assertEqual(
+            evaluate_frame(self.parser.create_ast("[baseline][a]='1'"), self.data_df).tolist(),
+            [True, True, True, False, False],
+        )
+
+    def test_multiindex_exports(self):
+        # PyCap's longitudinal export_records(format_type="df") indexes rows by (record, event)
+        data_df = self.data_df.set_index(["record_id", "redcap_event_name"])
+        index = EventIndex(data_df)
+        self.assertTrue(index.longitudinal)
+        self.assertEqual(index.position("3", "baseline"), 4)
+        self.assertEqual(index.record("1", "followup")[("baseline", "a")], "1")
+        ast = self.parser.create_ast("[baseline][a]='1'")
+        self.assertEqual(evaluate_frame(ast, data_df).tolist(), evaluate_frame(ast, self.data_df).tolist())
+        bitmaps = BitmapIndex(data_df)
+        self.assertEqual(bitmaps.to_mask(bitmaps.evaluate(ast)).tolist(), [True, True, True, False, False])
+
+    def test_repeating_instrument_rows(self):
+        data_df = pd.DataFrame({
+            "record_id": ["1", "1", "2"],
+            "redcap_event_name": ["base", "base", "base"],
+            "redcap_repeat_instrument": ["", "meds", np.nan],
+            "age": ["30", "", "40"],
+        })
+        index = EventIndex(data_df)
+        self.assertEqual(index.position("1", "base"), 0)
+        ast = self.parser.create_ast("[base][age]='30'")
+        self.assertEqual(evaluate_frame(ast, data_df).tolist(), [True, True, False])
+        self.assertEqual([evaluate_ast(ast, record) for _, _, record in index.records()], [True, True, False])
+
+        duplicated = data_df.assign(redcap_repeat_instrument="")
+        self.assertRaises(ValueError, evaluate_frame, ast, duplicated)
+        self.assertRaises(ValueError, EventIndex(duplicated).position, "1", "base")
+
+    def test_classic_projects_ignore_events(self):
+        data_df = pd.DataFrame({"a": ["1", "2"]}, index=pd.Index(["r1", "r2"], name="record_id"))
+        ast = self.parser.create_ast("[baseline][a]='1'")
+        self.assertEqual(evaluate_frame(ast, data_df).tolist(), [True, False])
+        self.assertTrue(self.parser.compile("[baseline][a]='1'")(EventIndex(data_df).record("r1")))
+
+    def test_streamed_exports_resolve_events(self):
+        df_datadict = pd.DataFrame(
+            {"branching_logic": [np.nan, np.nan, "[baseline][a]='1'"]},
+            index=pd.Index(["a", "b", "c"], name="field_name"),
+        )
+        plan = compile_data_dictionary(df_datadict)
+        buffer = io.StringIO(self.data_df.to_csv(index=False))
+        visible = [shown for _, _, field, shown in stream_csv(plan, buffer, chunksize=2) if field == "c"]
+        self.assertEqual(visible, [True, True, True, False, False])
+
+if __name__ == '__main__':
+    unittest.main()
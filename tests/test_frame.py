@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import BranchingLogicParser
+
+class EvaluateFrameTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+        self.data_df = pd.DataFrame(
+            {
+                "a": ["1", "2", "1", None],
+                "b": [2, 3, 2, 2],
+                "c": [1.0, np.nan, 3.0, 1.0],
+            },
+            index=pd.Index([101, 102, 103, 104], name="record_id"),
+        )
+
+    def assertMatchesRowwise(self, logic):
+        result = self.parser.evaluate_frame(logic, self.data_df)
+        rule = self.parser.compile(logic)
+        expected = [rule(row) for _, row in self.data_df.iterrows()]
+        self.assertEqual(result.tolist(), expected, logic)
+        self.assertTrue(result.index.equals(self.data_df.index))
+
+    def test_matches_rowwise_evaluation(self):
+        for logic in [
+            "[a]='1'",
+            "[a]<>'1' and [b]='2'",
+            "[a]='2' or [b]>'2'",
+            "!([a]='1' or [b]='3')",
+            "[c]='1.0' and [a]='1' and [b]='2'",
+            "[c]='nan' or [a]='None'",
+            "'1'='1' and [a]='1'",
+        ]:
+            with self.subTest(logic=logic):
+                self.assertMatchesRowwise(logic)
+
+    def test_returns_boolean_series(self):
+        result = self.parser.evaluate_frame("[a]='1'", self.data_df)
+        self.assertEqual(result.dtype, bool)
+        self.assertEqual(result.tolist(), [True, False, True, False])
+
+if __name__ == '__main__':
+    unittest.main()
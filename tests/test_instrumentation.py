@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+from redcap_branch_parser import BranchingLogicParser, CompiledRuleCache, ParseCache
+
+class InstrumentationTests(unittest.TestCase):
+    def test_disabled_by_default(self):
+        parser = BranchingLogicParser()
+        self.assertIsNone(parser.stats)
+        self.assertEqual(parser.parse.__name__, "__parse")
+
+    def test_phases_and_counters(self):
+        parser = BranchingLogicParser(cache=ParseCache(), instrument=True)
+        record = {"a": "1", "b": "2"}
+        self.assertTrue(parser.parse("[a]='1' and [b]='2'", record))
+        self.assertTrue(parser.parse("[a]='1' and [b]='2'", record))
+        self.assertTrue(parser.parse("[a]='1' or [b]='2'", record))
+
+        stats = parser.stats.snapshot()
+        self.assertEqual(stats.phases["parse"].calls, 3)
+        self.assertEqual(stats.phases["compile"].calls, 3)
+        self.assertEqual(stats.phases["create_ast"].calls, 3)
+        self.assertEqual(stats.phases["rule"].calls, 3)
+        self.assertGreaterEqual(stats.phases["parse"].seconds, stats.phases["create_ast"].seconds)
+        self.assertEqual((stats.cache_hits, stats.cache_misses), (1, 2))
+        # The OR short-circuits after its first lookup
+        self.assertEqual(stats.lookups, 5)
+        self.assertEqual(stats.ast_nodes, 9)
+
+        parser.stats.reset()
+        stats = parser.stats.snapshot()
+        self.assertEqual(stats.phases, {})
+        self.assertEqual((stats.cache_hits, stats.lookups, stats.ast_nodes), (0, 0, 0))
+
+    def test_disk_cache_hits(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with CompiledRuleCache(os.path.join(directory, "rules.sqlite")) as disk_cache:
+                BranchingLogicParser(cache=None, disk_cache=disk_cache).create_ast("[a]='1'")
+                parser = BranchingLogicParser(cache=None, disk_cache=disk_cache, instrument=True)
+                parser.assemble("[a]='1'")
+                stats = parser.stats.snapshot()
+        self.assertEqual((stats.cache_misses, stats.disk_cache_hits), (1, 1))
+        self.assertEqual(stats.phases["assemble"].calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
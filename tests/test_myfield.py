@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import pickle
+import unittest
+from redcap_branch_parser import BranchingLogicParser, FieldTable, myField
+
+class MyFieldTests(unittest.TestCase):
+    def test_immutable_hashable_and_slotted(self):
+        field = myField("a", event="ev", check="1")
+        self.assertEqual(field, myField("a", event="ev", check="1"))
+        self.assertNotEqual(field, myField("a", event="ev"))
+        self.assertEqual({field: 1}[myField("a", "ev", "1")], 1)
+        self.assertFalse(hasattr(field, "__dict__"))
+        with self.assertRaises(AttributeError):
+            field.field = "b"
+
+    def test_parsers_share_interned_fields(self):
+        for backend in ("pyparsing", "pratt"):
+            with self.subTest(backend=backend):
+                parser = BranchingLogicParser(cache=None, backend=backend)
+                first = parser.create_ast("[ev][a(1)]='1'")[0][0]
+                second = parser.create_ast("[b]='2' or [ev][a(1)]='2'")[0][2][0]
+                self.assertIs(first, second)
+
+    def test_per_project_tables(self):
+        table = FieldTable()
+        for backend in ("pyparsing", "pratt"):
+            with self.subTest(backend=backend):
+                project = BranchingLogicParser(backend=backend, field_table=table)
+                shared = BranchingLogicParser(backend=backend)
+                field = project.create_ast("[a]='1'")[0][0]
+                self.assertIs(field, table.intern("a"))
+                self.assertIsNot(field, shared.create_ast("[a]='1'")[0][0])
+                self.assertEqual(field, shared.create_ast("[a]='1'")[0][0])
+        self.assertEqual(len(table), 1)
+
+    def test_pickle_reinterns(self):
+        parser = BranchingLogicParser()
+        field = parser.create_ast("[a]='1'")[0][0]
+        self.assertIs(pickle.loads(pickle.dumps(field)), field)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+import unittest
+from redcap_branch_parser import BranchingLogicParser, parallel_evaluate
+
+class ParallelEvaluateTests(unittest.TestCase):
+    def test_results_follow_record_order(self):
+        parser = BranchingLogicParser()
+        rules = ["[a]='1'", parser.assemble("[a]='1' or [b]='2'"), "!([b]='2')"]
+        records = ({"a": str(index % 3), "b": str(index % 5)} for index in range(257))
+        results = list(parallel_evaluate(rules, records, workers=2, chunksize=10))
+
+        self.assertEqual(len(results), 257)
+        for index, result in enumerate(results):
+            a, b = str(index % 3), str(index % 5)
+            self.assertEqual(result, (a == "1", a == "1" or b == "2", b != "2"))
+
+    def test_worker_errors_are_raised(self):
+        with self.assertRaises(KeyError):
+            list(parallel_evaluate(["[missing]='1'"], [{"a": "1"}], workers=1))
+        with self.assertRaises(ValueError):
+            list(parallel_evaluate(["[a]='1'"], [], chunksize=0))
+
+if __name__ == '__main__':
+    unittest.main()
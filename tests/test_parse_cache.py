@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import unittest
+from redcap_branch_parser import BranchingLogicParser, ParseCache
+
+class ParseCacheTests(unittest.TestCase):
+    def test_identical_strings_parse_once(self):
+        parser = BranchingLogicParser(cache=ParseCache(maxsize=8))
+        first = parser.create_ast("[variable]='1'")
+        second = parser.create_ast("[variable]='1'")
+        self.assertIs(first, second)
+        info = parser.cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ParseCache(maxsize=2)
+        parser = BranchingLogicParser(cache=cache)
+        parser.create_ast("[a]='1'")
+        parser.create_ast("[b]='1'")
+        parser.create_ast("[a]='1'")
+        parser.create_ast("[c]='1'")
+        self.assertIn("[a]='1'", cache)
+        self.assertNotIn("[b]='1'", cache)
+        self.assertEqual(cache.info().evictions, 1)
+
+    def test_resize_and_clear(self):
+        cache = ParseCache(maxsize=4)
+        for name in "abcd":
+            cache.get_or_parse(name, list)
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.info().evictions, 3)
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 0, 1, 0))
+
+    def test_caching_can_be_disabled(self):
+        parser = BranchingLogicParser(cache=None)
+        self.assertIsNot(parser.create_ast("[a]='1'"), parser.create_ast("[a]='1'"))
+        self.assertRaises(ValueError, ParseCache, -1)
+
+if __name__ == '__main__':
+    unittest.main()
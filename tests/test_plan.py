@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import BranchingLogicParser, ParseCache, compile_data_dictionary
+
+class VisibilityPlanTests(unittest.TestCase):
+    def setUp(self):
+        self.df_datadict = pd.DataFrame(
+            {
+                "form_name": ["demo"] * 5,
+                "branching_logic": [np.nan, "[consent]='1'", "[consent]='1' ", "[consent]='1' and [age]<>''", ""],
+            },
+            index=pd.Index(["consent", "age", "sex", "pregnant", "notes"], name="field_name"),
+        )
+        self.data_df = pd.DataFrame(
+            {"consent": ["1", "0", "1"], "age": ["30", "40", ""], "sex": ["1", "2", "1"]},
+            index=pd.Index([1, 2, 3], name="record_id"),
+        )
+
+    def test_identical_logic_is_parsed_once(self):
+        parser = BranchingLogicParser(cache=ParseCache())
+        plan = compile_data_dictionary(self.df_datadict, parser)
+        self.assertEqual(plan.fields, ["consent", "age", "sex", "pregnant", "notes"])
+        self.assertEqual(len(plan.expressions), 2)
+        self.assertEqual(parser.cache.info().misses, 2)
+        self.assertIsNone(plan.field_logic["consent"])
+        self.assertIsNone(plan.field_logic["notes"])
+
+    def test_visibility_matrix(self):
+        matrix = compile_data_dictionary(self.df_datadict).evaluate(self.data_df)
+        self.assertEqual(list(matrix.columns), ["consent", "age", "sex", "pregnant", "notes"])
+        self.assertTrue(matrix.index.equals(self.data_df.index))
+        self.assertEqual(matrix["consent"].tolist(), [True, True, True])
+        self.assertEqual(matrix["age"].tolist(), [True, False, True])
+        self.assertEqual(matrix["sex"].tolist(), [True, False, True])
+        self.assertEqual(matrix["pregnant"].tolist(), [True, False, False])
+
+    def test_field_name_column_and_parse_errors(self):
+        df_datadict = self.df_datadict.reset_index()
+        self.assertEqual(compile_data_dictionary(df_datadict).fields[1], "age")
+        df_datadict.loc[1, "branching_logic"] = "[consent]="
+        with self.assertRaisesRegex(ValueError, "field 'age'"):
+            compile_data_dictionary(df_datadict)
+
+if __name__ == '__main__':
+    unittest.main()
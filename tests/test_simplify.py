@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import itertools
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import (
+    BranchingLogicParser, LookupCounter, compile_ast, compile_data_dictionary, estimate_selectivity,
+    evaluate_ast, evaluate_frame, simplify,
+)
+from redcap_branch_parser.logic_ast import count_nodes
+
+class SimplifyTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+
+    def assertSimplifiesTo(self, logic, expected, **options):
+        simplified = simplify(self.parser.create_ast(logic), **options)
+        self.assertEqual(repr(simplified), repr(self.parser.create_ast(expected)))
+
+    def test_redundancy_is_removed(self):
+        self.assertSimplifiesTo("([a]='1' OR [a]='1') AND ([b]='2')", "[a]='1' and [b]='2'")
+        self.assertSimplifiesTo("[a]='1' and ([a]='1' or [b]='2')", "[a]='1'")
+        self.assertSimplifiesTo("[a]='1' or ([b]='2' and [a]='1')", "[a]='1'")
+        self.assertSimplifiesTo("!(!([a]='1'))", "[a]='1'")
+        self.assertEqual(simplify(self.parser.create_ast("[a]='1' and ![a]='1'")), [[False]])
+        self.assertEqual(simplify(self.parser.create_ast("[b]='2' or [a]='1' or ![a]='1'")), [[True]])
+        self.assertEqual(simplify(self.parser.create_ast("'1'='2' or ([a]='1' and '1'='2')")), [[False]])
+
+    def test_comparison_chains_are_rejected(self):
+        for logic in ["[a]='1' <> [b]='1'", "[a]='1' = '2'='3'"]:
+            with self.subTest(logic=logic):
+                self.assertRaises(ValueError, simplify, self.parser.create_ast(logic))
+
+    def test_chains_are_flattened(self):
+        self.assertSimplifiesTo("[a]='1' and ([b]='2' and ([c]='3' and [d]='4'))", "[a]='1' and [b]='2' and [c]='3' and [d]='4'")
+        self.assertSimplifiesTo("([a]='1' or [b]='2') and [c]='3'", "([a]='1' or [b]='2') and [c]='3'", reorder=False)
+
+    def test_operands_are_ordered_by_cost(self):
+        # Equality rarely holds, so it decides an AND early and an OR late; constants are free
+        self.assertSimplifiesTo("[a]<>'1' and [b]='2'", "[b]='2' and [a]<>'1'")
+        self.assertSimplifiesTo("[a]='1' or [b]<>'2'", "[b]<>'2' or [a]='1'")
+        self.assertSimplifiesTo("([a]='1' or [b]='2' or [c]='3') and [d]='4'", "[d]='4' and ([a]='1' or [b]='2' or [c]='3')")
+        self.assertSimplifiesTo("[a]<>'1' and [b]='2'", "[a]<>'1' and [b]='2'", reorder=False)
+
+    def test_sample_selectivity(self):
+        sample_df = pd.DataFrame({"a": ["1"] * 9 + ["2"], "b": ["1", "2"] * 5})
+        selectivity = estimate_selectivity(sample_df)
+        self.assertAlmostEqual(selectivity(self.parser.create_ast("[a]='1'")[0]), 0.9)
+        # [a]='1' almost always holds, so [b]='2' is more likely to end the AND
+        self.assertSimplifiesTo("[a]='1' and [b]='2'", "[b]='2' and [a]='1'", selectivity=selectivity)
+        self.assertSimplifiesTo("[b]='2' or [a]='1'", "[a]='1' or [b]='2'", selectivity=selectivity)
+        self.assertEqual(selectivity(self.parser.create_ast("[missing]='1'")[0]), 0.25)
+
+    def test_input_is_not_modified(self):
+        ast = self.parser.create_ast("([a]='1' or [a]='1') and ([b]<>'2' and [c]='3')")
+        before = repr(ast)
+        simplify(ast)
+        self.assertEqual(repr(ast), before)
+
+    def test_simplified_rules_agree_with_the_original(self):
+        logic = [
+            "([a]='1' or [a]='1') and ([b]='2')",
+            "[a]='1' and ([a]='1' or [b]='2') and !(![c]<>'x')",
+            "([a]='1' and [b]='2') or [a]='1' or ([c]='x' or ([b]<>'1' and [a]='1'))",
+            "!([a]='1' or [b]='2') and ([c]='x' or ![c]='x')",
+            "[a]='1' or ![a]='1' and [b]='2'",
+        ]
+        values = ["1", "2", "x"]
+        records = [dict(zip("abc", combination)) for combination in itertools.product(values, repeat=3)]
+        data_df = pd.DataFrame(records)
+        for string in logic:
+            with self.subTest(logic=string):
+                ast = self.parser.create_ast(string)
+                simplified = simplify(ast)
+                self.assertLessEqual(count_nodes(simplified), count_nodes(ast))
+                expected = [compile_ast(ast)(record) for record in records]
+                self.assertEqual([compile_ast(simplified)(record) for record in records], expected)
+                self.assertEqual([evaluate_ast(simplified, record) for record in records], expected)
+                self.assertEqual(evaluate_frame(simplified, data_df).tolist(), expected)
+
+    def test_fewer_lookups(self):
+        ast = self.parser.create_ast("([a]<>'1' or [a]<>'1') and ([b]='2' or [b]='2')")
+        records = [{"a": a, "b": b} for a in "12" for b in "12"]
+
+        def lookups(rule):
+            counter = LookupCounter()
+            for record in records:
+                evaluate_ast(rule, record, counter)
+            return counter.performed
+
+        self.assertEqual(lookups(ast), 9)
+        self.assertEqual(lookups(simplify(ast)), 6)
+
+    def test_plan_and_parser(self):
+        df_datadict = pd.DataFrame(
+            {"branching_logic": [np.nan, np.nan, "([a]='1' or [a]='1') and [c]<>'2'"]},
+            index=pd.Index(["a", "c", "d"], name="field_name"),
+        )
+        data_df = pd.DataFrame({"a": ["1", "1", "2"], "c": ["1", "2", "1"]})
+        plan = compile_data_dictionary(df_datadict)
+        simplified = plan.simplify(data_df)
+        self.assertLess(simplified.sharing().nodes, plan.sharing().nodes)
+        self.assertTrue(simplified.evaluate(data_df).equals(plan.evaluate(data_df)))
+        self.assertEqual(simplified.evaluate_record({"a": "1", "c": "1"}), plan.evaluate_record({"a": "1", "c": "1"}))
+        self.assertEqual(repr(self.parser.simplify("[a]='1' and [a]='1'")), repr(self.parser.create_ast("[a]='1'")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import itertools
+import unittest
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import (
+    BitmapIndex, BranchingLogicParser, NUMBER, SharedExpressions, assemble, compile_ast, compile_data_dictionary,
+    evaluate_ast, evaluate_frame, execute, specialize, to_sql,
+)
+
+class SpecializeTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+
+    def test_known_fields_are_folded(self):
+        ast = self.parser.create_ast("[site]='2' and ([a]='1' or [region]<>'x') and [b]='2'")
+        self.assertEqual(repr(specialize(ast, {"site": "2", "region": "x"})), repr(self.parser.create_ast("[a]='1' and [b]='2'")))
+        self.assertEqual(specialize(ast, {"site": "1"}), [[False]])
+        self.assertEqual(specialize(self.parser.create_ast("!([site]='1' or [a]='1')"), {"site": "1"}), [[False]])
+        self.assertEqual(specialize(self.parser.create_ast("'1'='1' or [a]='1'"), {}), [[True]])
+
+    def test_unchanged_subtrees_are_shared(self):
+        ast = self.parser.create_ast("[a]='1' and [b]='2'")
+        self.assertIs(specialize(ast, {"c": "1"})[0], ast[0])
+        residual = specialize(self.parser.create_ast("[site]='1' and !([a]='1' or [b]='2')"), {"site": "1"})
+        self.assertEqual(repr(residual), repr(self.parser.create_ast("!([a]='1' or [b]='2')")))
+
+    def test_typed_and_checkbox_fields(self):
+        ast = self.parser.create_ast("[age]>='18' and [meds(2)]='1' and [a]='1'")
+        self.assertEqual(specialize(ast, {"age": "9"}, {"age": NUMBER}), [[False]])
+        self.assertEqual(repr(specialize(ast, {"age": "30", "meds___2": 1})), repr(self.parser.create_ast("[a]='1'")))
+
+    def test_residual_rules_agree_with_the_original(self):
+        logic = "([site]='1' and [a]='1') or (![b]='2' and [site]<>'3') or [c]='x'"
+        ast = self.parser.create_ast(logic)
+        values = ["1", "2", "3", "x"]
+        records = [dict(zip("abc", combination)) for combination in itertools.product(values, repeat=3)]
+        for site in values:
+            with self.subTest(site=site):
+                residual = specialize(ast, {"site": site})
+                full = [dict(record, site=site) for record in records]
+                expected = [compile_ast(ast)(record) for record in full]
+                self.assertEqual([compile_ast(residual)(record) for record in records], expected)
+                self.assertEqual([evaluate_ast(residual, record) for record in records], expected)
+                self.assertEqual([execute(assemble(residual), record) for record in records], expected)
+                data_df = pd.DataFrame(records)
+                self.assertEqual(evaluate_frame(residual, data_df).tolist(), expected)
+                bitmaps = BitmapIndex(data_df)
+                self.assertEqual(bitmaps.to_mask(bitmaps.evaluate(residual)).tolist(), expected)
+                self.assertEqual(SharedExpressions({"r": residual}).evaluate_record(records[0])["r"], expected[0])
+
+    def test_constants_everywhere(self):
+        for value in (True, False):
+            ast = [[value]]
+            self.assertIs(compile_ast(ast)({}), value)
+            self.assertIs(evaluate_ast(ast, {}), value)
+            self.assertIs(execute(assemble(ast), {}), value)
+            self.assertEqual(to_sql(ast).sql, "1 = 1" if value else "1 = 0")
+            self.assertEqual(self.parser.evaluate(self.parser.substitute(ast, {})), value)
+
+    def test_plan_and_parser(self):
+        df_datadict = pd.DataFrame(
+            {"branching_logic": [np.nan, np.nan, "[site]='1' and [a]='1'", "[site]='2'"]},
+            index=pd.Index(["site", "a", "b", "c"], name="field_name"),
+        )
+        plan = compile_data_dictionary(df_datadict).specialize({"site": "1"})
+        self.assertEqual(plan.referenced_columns(), ["a"])
+        matrix = plan.evaluate(pd.DataFrame({"a": ["1", "2"]}))
+        self.assertEqual(matrix["b"].tolist(), [True, False])
+        self.assertEqual(matrix["c"].tolist(), [False, False])
+        self.assertEqual(self.parser.specialize("[site]='1' and [a]='1'", {"site": "2"}), [[False]])
+
+if __name__ == '__main__':
+    unittest.main()
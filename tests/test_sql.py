@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import sqlite3
+import unittest
+from redcap_branch_parser import BranchingLogicParser
+
+class SQLTranslationTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = BranchingLogicParser()
+        self.connection = sqlite3.connect(":memory:")
+        self.addCleanup(self.connection.close)
+        self.connection.execute(
+            'CREATE TABLE records (record_id INTEGER, redcap_event_name TEXT, a INTEGER, b TEXT, "meds___2" INTEGER)'
+        )
+        self.connection.executemany(
+            "INSERT INTO records VALUES (?, ?, ?, ?, ?)",
+            [
+                (1, "baseline", 1, "x", 1),
+                (1, "followup", 2, None, 0),
+                (2, "baseline", 2, "y", 0),
+                (2, "followup", 1, "z", 1),
+                (3, "baseline", None, "x", None),
+            ],
+        )
+
+    def matching(self, logic):
+        sql, params = self.parser.to_sql(logic)
+        rows = self.connection.execute(
+            f"SELECT record_id, redcap_event_name FROM records WHERE {sql} ORDER BY record_id, redcap_event_name", params
+        )
+        return [tuple(row) for row in rows]
+
+    def test_comparisons_and_boolean_operators(self):
+        self.assertEqual(self.matching("[a]='1'"), [(1, "baseline"), (2, "followup")])
+        self.assertEqual(self.matching("[a]='1' and [b]='x'"), [(1, "baseline")])
+        self.assertEqual(self.matching("[a]='2' or [b]='x'"), [(1, "baseline"), (1, "followup"), (2, "baseline"), (3, "baseline")])
+        self.assertEqual(self.matching("!([a]='1' or [a]='2')"), [(3, "baseline")])
+        self.assertEqual(self.matching("[b]=''"), [(1, "followup")])
+        self.assertEqual(self.matching("[b]>'x' and '1'='1'"), [(2, "baseline"), (2, "followup")])
+
+    def test_checkbox_and_event_references(self):
+        self.assertEqual(self.matching("[meds(2)]='1'"), [(1, "baseline"), (2, "followup")])
+        self.assertEqual(self.matching("[followup][a]='1'"), [(2, "baseline"), (2, "followup")])
+        self.assertEqual(self.matching("[baseline][meds(2)]='1' and [a]='2'"), [(1, "followup")])
+
+    def test_values_are_parameters(self):
+        sql, params = self.parser.to_sql("[a]=\"x' OR '1'='1\"", table="my table", placeholder="%s")
+        self.assertEqual(sql, 'COALESCE(CAST("my table"."a" AS TEXT), \'\') = %s')
+        self.assertEqual(params, ["x' OR '1'='1"])
+        self.assertEqual(self.matching("[a]=\"x' OR '1'='1\""), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from redcap_branch_parser import compile_data_dictionary, stream_csv
+
+class StreamCSVTests(unittest.TestCase):
+    def setUp(self):
+        df_datadict = pd.DataFrame(
+            {"branching_logic": [np.nan, np.nan, "[consent]='1'", "[consent]='1' and [age]<>''"]},
+            index=pd.Index(["record_id", "consent", "age", "pregnant"], name="field_name"),
+        )
+        self.plan = compile_data_dictionary(df_datadict)
+
+    def test_matches_plan_evaluation(self):
+        data_df = pd.DataFrame({
+            "record_id": [str(index) for index in range(23)],
+            "consent": [str(index % 2) for index in range(23)],
+            "age": ["" if index % 3 else "40" for index in range(23)],
+        })
+        buffer = io.StringIO(data_df.to_csv(index=False))
+        results = list(stream_csv(self.plan, buffer, chunksize=5))
+
+        matrix = self.plan.evaluate(data_df)
+        expected = [
+            (record, None, field, bool(matrix.at[row, field]))
+            for row, record in enumerate(data_df["record_id"])
+            for field in self.plan.fields
+        ]
+        self.assertEqual(results, expected)
+
+    def test_blank_cells_stay_blank(self):
+        buffer = io.StringIO("record_id,consent,age\n1,1,\n2,1,NA\n")
+        visible = {(record, field): shown for record, _, field, shown in stream_csv(self.plan, buffer)}
+        self.assertFalse(visible[("1", "pregnant")])
+        self.assertTrue(visible[("2", "pregnant")])
+
+    def test_chunks_keep_records_together(self):
+        csv = "record_id,redcap_event_name,consent,age\n" + "".join(
+            f"{record},event_{event},1,30\n" for record in "abc" for event in range(3)
+        )
+        with mock.patch.object(self.plan, "evaluate", wraps=self.plan.evaluate) as evaluate:
+            results = list(stream_csv(self.plan, io.StringIO(csv), chunksize=2))
+        self.assertEqual(len(results), 9 * len(self.plan.fields))
+        self.assertEqual(results[0], ("a", "event_0", "record_id", True))
+        for call in evaluate.call_args_list:
+            records = call.args[0]["record_id"].tolist()
+            self.assertTrue(all(records.count(record) in (0, 3) for record in "abc"))
+        with self.assertRaises(ValueError):
+            list(stream_csv(self.plan, io.StringIO(csv), chunksize=0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import logging
+import unittest
+from redcap_branch_parser import BranchingLogicParser, NUMBER, TraceEvent, compile_ast, log_trace
+
+class TraceTests(unittest.TestCase):
+    def test_substitute_does_not_print(self):
+        parser = BranchingLogicParser()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            parser.substitute(parser.create_ast("[a]='1' and [b(2)]='1'"), {"a": "1", "b___2": "0"})
+        self.assertEqual(output.getvalue(), "")
+
+    def test_events_describe_each_comparison(self):
+        events = []
+        parser = BranchingLogicParser(trace=events.append)
+        record = {"a": "1", "b___2": "0"}
+        self.assertFalse(parser.parse("[a]='1' and [b(2)]='1'", record))
+        parser.substitute(parser.create_ast("[a]<>'1'"), record)
+
+        self.assertEqual([(str(e.field), e.operator, e.expected, e.value, e.result) for e in events], [
+            ("[a]", "=", "1", "1", True),
+            ("[b(2)]", "=", "1", "0", False),
+            ("[a]", "<>", "1", "1", False),
+        ])
+        self.assertIsInstance(events[0], TraceEvent)
+
+    def test_typed_comparisons_are_traced(self):
+        events = []
+        ast = BranchingLogicParser().create_ast("[age]>='18'")
+        self.assertFalse(compile_ast(ast, {"age": NUMBER}, trace=events.append)({"age": "9"}))
+        self.assertEqual((events[0].value, events[0].result), ("9", False))
+
+    def test_log_trace(self):
+        logger = logging.getLogger("redcap_branch_parser.trace.test")
+        parser = BranchingLogicParser(trace=log_trace(logger))
+        with self.assertLogs(logger, logging.DEBUG) as logs:
+            parser.parse("[a]='1'", {"a": "2"})
+        self.assertEqual(logs.output, ["DEBUG:redcap_branch_parser.trace.test:[a] = '1': '2' -> False"])
+
+if __name__ == '__main__':
+    unittest.main()